@@ -7,39 +7,62 @@ It uses the following environment variables:
 - SEND_INTERVAL: Interval between email sends in hours.
 - NEXT_SEND: The next scheduled email send time.
 - SEND_EVERY: The time unit for scheduling (e.g., 'days', 'hours', 'minutes').
-- PRINTER_IP: The IP address of the printer to retrieve statistics from.
+- PRINTER_IP: The IP address of the printer to retrieve statistics from, or a comma-separated list of addresses.
 - SMTP_SERVER: The SMTP server for sending emails.
 - EMAIL_LOGIN: The login username for the email account.
 - EMAIL_PASSWORD: The password for the email account.
 - SMTP_PORT: The SMTP port for email sending.
 - EMAIL_RECEIVER: The recipient email address.
 - ENCRYPTION: The encryption method for the email (e.g., 'TLS', 'SSL').
+- SEND_MODE: 'all' (default) to send every printer, or 'changes' to send only printers that changed.
+- MONTHLY_THRESHOLD: Optional number of pages per month above which a printer is reported in 'changes' mode.
+- READINGS_FILE: The file keeping the last readings for 'changes' mode (default 'readings.json').
+- HEALTH_FILE: The file keeping the health of the printers between runs (default 'health.json').
+- REPORT_MEMO_FILE: The file keeping the hash of the last report of every printer (default 'report_memo.json').
+- POLL_DEADLINE: The time in seconds after which printers that did not answer are missed (default 60).
+- HEDGE: 'yes' to send a second request to printers slower than usual (default 'no').
+- DEVICE_CONCURRENCY, DEVICE_RATE_LIMIT: The requests in flight (default 1) and per second allowed per printer.
+- SUBNET_CONCURRENCY, SUBNET_RATE_LIMIT, SUBNET_PREFIX: The same limits per subnet of SUBNET_PREFIX bits (default 24).
+- REPORT_PAGES: Optional comma-separated reports fetched besides the statistics, e.g. 'supplies,status'.
+- ARCHIVE_DIR: Optional directory archiving every raw report fetched from the printers.
+- ARCHIVE_RETENTION_DAYS: Optional number of days the archived reports are kept.
+- ROUTES_FILE: Optional JSON file routing printers to receivers and SMTP servers (see 'utils/routing.py').
+- VERIFY_RATE: The fraction of reads, between 0 and 1, cross-checked against the full HTML parser (default 0).
 
 The script utilizes external modules and utilities such as 'autostart', 'message', 'printer',
 'schedule', and 'template' for its functionality.
 
 Usage:
-    To use this script, configure the required environment variables and run it. It will
-    periodically send printer statistics via email based on the specified interval.
+    To use this script, configure the required environment variables and run it with one of
+    the commands below. Without a command it runs as a daemon.
+
+    python main.py run-once   Run a single scheduled cycle, e.g. from cron or a systemd timer.
+    python main.py poll       Print the printer serial number and counter.
+    python main.py send       Send the printer statistics now, regardless of the schedule.
+    python main.py daemon     Send printer statistics periodically based on the specified interval.
+    python main.py export     Export the printer statistics to a columnar, JSONL or CSV file.
+    python main.py reparse    Extract the statistics from a directory of saved reports.
+    python main.py serve      Serve the latest printer counters over HTTP/JSON to other local tools.
+
+Heavy modules are imported only by the commands that need them, and the Windows-only
+autostart is used only on Windows, so one-shot runs start quickly on any platform.
 """
 
+import argparse
+import json
 from os import getenv, environ
 from pathlib import Path
+import sys
 from time import sleep
 
-from dotenv import load_dotenv
-
-from utils import autostart
 from utils.exceptions import CreateReportError
-from utils.message import Email
-from utils.printer import Device
-from utils.schedule import Schedule
-from utils.template import message_body, message_title
+
+_poller = None
 
 
 def change_next_send_date(next_send: str):
     """
-    Change the value of the 'NEXT_SEND' environment variable or update the '.env' file
+    Change the value of the 'NEXT_SEND' environment variable and update the '.env' file, if it exists,
     with the provided 'next_send' value.
 
     Args:
@@ -51,51 +74,478 @@ def change_next_send_date(next_send: str):
             for line in file.readlines():
                 if 'NEXT_SEND' not in line:
                     content += line
+            if content and not content.endswith('\n'):
+                content += '\n'
             content += f'NEXT_SEND = {next_send}'
         with open('.env', 'w') as file:
             file.write(content)
-    else:
-        environ['NEXT_SEND'] = next_send
+    environ['NEXT_SEND'] = next_send
 
 
-def main():
+def printer_ips() -> list:
     """
-    Main function to automate sending periodic emails with printer statistics.
+    Get the IP addresses of the printers set in 'PRINTER_IP'.
 
-    It checks if the script should run automatically at startup, schedules email sending
-    based on the specified interval, retrieves printer statistics, sends the statistics
-    via email, and updates the 'NEXT_SEND' value.
+    Returns:
+        list: The IP addresses of the printers.
     """
-    if not autostart.check(__file__):
-        autostart.add(__file__)
+    return [ip_address.strip() for ip_address in getenv('PRINTER_IP').split(',') if ip_address.strip()]
 
-    while True:
-        schedule = Schedule(int(getenv('SEND_INTERVAL')), getenv('NEXT_SEND'))
-        schedule.call_every(getenv('SEND_EVERY').lower())
-        if schedule.check_time():
-            try:
-                with Device(getenv('PRINTER_IP')) as device:
-                    serial_number = device.get_serial_number()
-                    counter = device.get_counter()
-            except CreateReportError:
-                sleep(60*60)  # wait 60 minutes and try to create report again
-                continue
 
-            message = Email(
-                smtp_server=getenv('SMTP_SERVER'),
-                login=getenv('EMAIL_LOGIN'),
-                password=getenv('EMAIL_PASSWORD'),
-                port=int(getenv('SMTP_PORT')),
-                receiver=getenv('EMAIL_RECEIVER'),
-                encryption=getenv('ENCRYPTION'),
+def get_poller():
+    """
+    Get the poller shared by all commands, creating it on first use. The health of the printers
+    is kept in the file set in 'HEALTH_FILE' and the hash of the last report of every printer in
+    'REPORT_MEMO_FILE', so they survive between one-shot runs, and the raw reports are archived in
+    'ARCHIVE_DIR', if set.
+
+    Requests are limited per printer to 'DEVICE_CONCURRENCY' in flight (default 1) and 'DEVICE_RATE_LIMIT'
+    per second, and per subnet of 'SUBNET_PREFIX' bits (default 24) to 'SUBNET_CONCURRENCY' in flight and
+    'SUBNET_RATE_LIMIT' per second. The limits that are not set do not apply.
+
+    Besides the statistics report, the comma-separated reports in 'REPORT_PAGES', e.g. 'supplies,status',
+    are fetched from every printer over the same session.
+
+    Returns:
+        Poller: The shared poller.
+    """
+    global _poller
+
+    if _poller is None:
+        from utils.health import HealthTracker
+        from utils.poller import Poller
+        from utils.ratelimit import RateLimiter
+
+        archive = None
+        if getenv('ARCHIVE_DIR'):
+            from utils.archive import ReportArchive
+
+            retention = getenv('ARCHIVE_RETENTION_DAYS')
+            archive = ReportArchive(getenv('ARCHIVE_DIR'), float(retention) if retention else None)
+
+        device_rate, subnet_rate = getenv('DEVICE_RATE_LIMIT'), getenv('SUBNET_RATE_LIMIT')
+        subnet_concurrency = getenv('SUBNET_CONCURRENCY')
+        limiter = RateLimiter(
+            device_rate=float(device_rate) if device_rate else None,
+            device_concurrency=int(getenv('DEVICE_CONCURRENCY', '1')),
+            subnet_rate=float(subnet_rate) if subnet_rate else None,
+            subnet_concurrency=int(subnet_concurrency) if subnet_concurrency else None,
+            prefix=int(getenv('SUBNET_PREFIX', '24')),
+        )
+        pages = [page.strip() for page in getenv('REPORT_PAGES', '').split(',') if page.strip()]
+        _poller = Poller(
+            HealthTracker(getenv('HEALTH_FILE', 'health.json')), archive=archive, limiter=limiter, pages=pages,
+            memo_path=getenv('REPORT_MEMO_FILE', 'report_memo.json'),
+            verify_rate=float(getenv('VERIFY_RATE', '0')),
+        )
+    return _poller
+
+
+def save_poller_state():
+    """
+    Save the health and the last report hashes of the printers, if any printer was polled.
+    """
+    if _poller is not None:
+        _poller.save()
+
+
+def prune_archive():
+    """
+    Remove the archived reports older than 'ARCHIVE_RETENTION_DAYS', if any printer was polled.
+    Only the scheduled cycles prune, so the other commands do not walk the whole archive.
+    """
+    if _poller is not None and _poller.archive:
+        _poller.archive.prune()
+
+
+def read_devices() -> dict:
+    """
+    Retrieve the serial number and the counter from every printer in a single poll cycle.
+
+    The cycle ends after 'POLL_DEADLINE' seconds (default 60), printers known to be down are skipped
+    and, with 'HEDGE' set to 'yes', slow printers get a second request.
+
+    Returns:
+        dict: The serial number and counter tuple of every printer, keyed by IP address, or the
+            exception raised for the printer: CreateReportError if it did not respond, ReportError
+            if its report could not be read and InvalidAddressError if its address is invalid.
+    """
+    return get_poller().poll(
+        printer_ips(),
+        deadline=float(getenv('POLL_DEADLINE', '60')),
+        hedge=getenv('HEDGE', 'no').lower() == 'yes',
+    )
+
+
+def report_all() -> list:
+    """
+    Create the email body parts with the statistics of every printer. Printers that do not respond
+    or whose report cannot be read are listed as such, so they do not hold back the report of the
+    other printers.
+
+    Raises:
+        CreateReportError: If no printer report can be created.
+
+    Returns:
+        list: The IP address, serial number and email body part of every printer.
+    """
+    from utils.template import message_body, not_responding_body, unreadable_body
+
+    parts = []
+    failed = []
+    for ip_address, result in read_devices().items():
+        if isinstance(result, CreateReportError):
+            failed.append((ip_address, None, not_responding_body(ip_address)))
+        elif isinstance(result, Exception):
+            failed.append((ip_address, None, unreadable_body(ip_address)))
+        else:
+            serial_number, counter = result
+            parts.append((ip_address, serial_number, message_body(counter, serial_number)))
+    if not parts:
+        raise CreateReportError
+    return parts + failed
+
+
+def report_changes() -> tuple:
+    """
+    Find the printers whose readings are worth reporting since the last run: new printers,
+    changed counters, crossed monthly thresholds and printers that stopped responding or whose
+    report cannot be read. Printers serving the same report as for their stored reading are skipped
+    without updating it, whatever other commands read in between.
+
+    The readings are not saved here, so the changes are found again by the next run if they
+    cannot be sent.
+
+    Returns:
+        tuple: The IP address, serial number and change of every printer worth reporting, and the
+            updated ReadingStore to save once the changes are sent.
+    """
+    from utils.readings import NOT_RESPONDING, UNREADABLE, ReadingStore
+
+    threshold = getenv('MONTHLY_THRESHOLD')
+    store = ReadingStore(getenv('READINGS_FILE', 'readings.json'), int(threshold) if threshold else None)
+
+    changes = []
+    for ip_address, result in read_devices().items():
+        if isinstance(result, Exception):
+            change = store.mark_unreachable(
+                ip_address, NOT_RESPONDING if isinstance(result, CreateReportError) else UNREADABLE,
             )
+        else:
+            serial_number, counter = result
+            if store.is_unchanged(ip_address, serial_number, result.report_hash):
+                continue
+            change = store.update(ip_address, serial_number, counter, report_hash=result.report_hash)
+        if change:
+            changes.append((ip_address, change['serial_number'], change))
+    return changes, store
+
+
+def export_readings(path: str, export_format: str = None) -> int:
+    """
+    Retrieve the statistics of every printer and export them for bulk import.
+    Printers that do not respond or whose report cannot be read are left out of the export.
+
+    Args:
+        path (str): The path to the output file.
+        export_format (str): 'columnar', 'jsonl' or 'csv', defaults to the format matching the file extension.
+
+    Returns:
+        int: The number of exported readings.
+    """
+    from datetime import datetime, timezone
+
+    from utils import export
+    from utils.readings import counter_value
+
+    export_format = export_format or {'.jsonl': 'jsonl', '.csv': 'csv'}.get(Path(path).suffix, 'columnar')
+
+    def readings():
+        for ip_address, result in read_devices().items():
+            if isinstance(result, Exception):
+                continue
+            serial_number, counter = result
+            yield {
+                'time': datetime.now(timezone.utc),
+                'ip_address': ip_address,
+                'serial_number': serial_number,
+                'counter': counter_value(counter),
+            }
+
+    if export_format == 'columnar':
+        return export.write_columnar(readings(), path)
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        if export_format == 'jsonl':
+            return export.write_jsonl(readings(), file)
+        return export.write_csv(readings(), file)
+
+
+def create_router():
+    """
+    Create the router of the printer statistics. Without 'ROUTES_FILE' every printer is sent to
+    'EMAIL_RECEIVER' through the SMTP server set in the environment, which may be left unset when
+    the routes file defines every server.
+
+    Returns:
+        Router: The router.
+    """
+    from utils.routing import Router
+
+    port = getenv('SMTP_PORT')
+    default_server = {
+        'smtp_server': getenv('SMTP_SERVER'),
+        'login': getenv('EMAIL_LOGIN'),
+        'password': getenv('EMAIL_PASSWORD'),
+        'port': int(port) if port else None,
+        'encryption': getenv('ENCRYPTION'),
+    }
+    if getenv('ROUTES_FILE'):
+        return Router.from_file(getenv('ROUTES_FILE'), getenv('EMAIL_RECEIVER'), default_server)
+    return Router({}, getenv('EMAIL_RECEIVER'), default_server)
+
+
+def send_report(parts: list, create_body=None):
+    """
+    Send the printer statistics via email. The parts are routed to their receivers, every receiver
+    gets a single email and every SMTP server a single connection carrying all of its emails.
+
+    Every server is tried even if another one fails. Failures are printed as long as at least one server
+    sent its emails, so the emails already sent are not sent again by the next cycle.
+
+    Args:
+        parts (list): The IP address, serial number and email body part of every printer.
+        create_body (Callable[[list], str]): Creates an email body from the parts of a receiver,
+            by default the parts are joined with blank lines.
+
+    Raises:
+        OSError: If no server could send its emails.
+    """
+    from utils.message import Email
+    from utils.template import message_title
+
+    create_body = create_body or '\n'.join
+    errors = []
+    routes = create_router().route(parts)
+    for server, messages in routes:
+        try:
+            Email(receiver=None, **server).send_many([
+                (receiver, message_title(), create_body(payloads)) for receiver, payloads in messages.items()
+            ])
+        except OSError as error:  # smtplib.SMTPException is an OSError
+            errors.append(error)
+            print(f'Unable to send the report through {server["smtp_server"]}: {error}', file=sys.stderr)
+    if errors and len(errors) == len(routes):
+        raise errors[0]
+
+
+def run_once() -> bool:
+    """
+    Run a single scheduled cycle: if the report is due, retrieve printer statistics,
+    send them via email and update the 'NEXT_SEND' value.
+
+    With 'SEND_MODE' set to 'changes' only the printers that changed since the last run are
+    sent, and no email is sent at all if nothing changed.
+
+    Raises:
+        CreateReportError: If the device report cannot be created.
+
+    Returns:
+        bool: True if the report was sent, False if it was not due yet or nothing changed.
+    """
+    from utils.schedule import Schedule
+
+    schedule = Schedule(int(getenv('SEND_INTERVAL')), int(getenv('NEXT_SEND')))
+    schedule.call_every(getenv('SEND_EVERY').lower())
+    if not schedule.check_time():
+        return False
+
+    if getenv('SEND_MODE', 'all').lower() == 'changes':
+        from utils.template import changes_body
+
+        parts, store = report_changes()
+        if parts:
+            send_report(parts, changes_body)
+        store.save()
+    else:
+        parts = report_all()
+        send_report(parts)
+    change_next_send_date(str(schedule.next_call))
+    return bool(parts)
+
+
+def poll(snapshot: bool = False) -> int:
+    """
+    Print the IP address, serial number and counter of every printer.
+
+    Args:
+        snapshot (bool): Whether to print the snapshot of all the reports of every printer as a JSON line instead.
+
+    Returns:
+        int: 0 if every printer responded, 1 otherwise.
+    """
+    exit_code = 0
+    for ip_address, result in read_devices().items():
+        if isinstance(result, CreateReportError):
+            print(f'Unable to create report for printer {ip_address}', file=sys.stderr)
+            exit_code = 1
+        elif isinstance(result, Exception):
+            print(f'Unable to read report of printer {ip_address}', file=sys.stderr)
+            exit_code = 1
+        elif snapshot:
+            print(json.dumps(get_poller().snapshots[ip_address]))
+        else:
+            serial_number, counter = result
+            print(f'{ip_address} {serial_number} {counter}')
+    return exit_code
+
+
+def reparse_reports(directory: str, output: str, pattern: str = '*.html', processes: int = None) -> int:
+    """
+    Extract the serial numbers and counters from a directory of saved reports into a JSON Lines file,
+    printing the progress. Reports already in the output file are skipped, so an interrupted run resumes.
+    'VERIFY_RATE' sets the fraction of values cross-checked against the full HTML parser.
+
+    Args:
+        directory (str): The directory with the saved reports.
+        output (str): The JSON Lines output file.
+        pattern (str): The glob pattern of the report file names.
+        processes (int): The number of worker processes, defaults to the number of CPUs.
+
+    Returns:
+        int: The number of reports parsed in this run.
+    """
+    from utils.reparse import find_reports, reparse
+
+    def progress(done: int, total: int):
+        if done == total or done % 100 == 0:
+            print(f'Parsed {done}/{total} reports', file=sys.stderr)
 
-            message.send(message_title(), message_body(counter, serial_number))
-            change_next_send_date(schedule.next_call)
+    return reparse(
+        find_reports(directory, pattern), output, processes, progress, float(getenv('VERIFY_RATE', '0')),
+    )
 
+
+def serve(host: str, port: int, max_age: float):
+    """
+    Serve the latest printer counters over HTTP/JSON until interrupted.
+
+    Args:
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+        max_age (float): The age in seconds after which a counter is read again from the printer.
+    """
+    from utils.service import CounterIndex, create_server
+
+    server = create_server(CounterIndex(printer_ips(), get_poller().read, max_age), host, port)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def daemon():
+    """
+    Automate sending periodic emails with printer statistics.
+
+    On Windows it checks if the script should run automatically at startup. It then runs
+    a scheduled cycle every hour for as long as the process lives.
+    """
+    if sys.platform == 'win32':
+        from utils import autostart
+
+        if not autostart.check(Path(__file__).name):
+            autostart.add(Path(__file__))
+
+    while True:
+        try:
+            run_once()
+        except CreateReportError:
+            pass  # wait 60 minutes and try to create report again
+        save_poller_state()
+        prune_archive()
         sleep(60*60)
 
 
-if __name__ == '__main__':
+def parse_args(argv: list = None) -> argparse.Namespace:
+    """
+    Parse the command line arguments.
+
+    Args:
+        argv (list): The command line arguments, defaults to 'sys.argv'.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(description='Send Konica Minolta printer statistics via email.')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('run-once', help='run a single scheduled cycle, e.g. from cron or a systemd timer')
+    poll_parser = subparsers.add_parser('poll', help='print the printer statistics without sending them')
+    poll_parser.add_argument(
+        '--snapshot', action='store_true', help='print all the reports of every printer as JSON lines',
+    )
+    subparsers.add_parser('send', help='send the printer statistics now, regardless of the schedule')
+    subparsers.add_parser('daemon', help='run scheduled cycles every hour (default)')
+    export_parser = subparsers.add_parser('export', help='export the printer statistics for bulk import')
+    export_parser.add_argument('path', help='the output file')
+    export_parser.add_argument(
+        '--format', dest='export_format', choices=('columnar', 'jsonl', 'csv'),
+        help='the output format, defaults to the format matching the file extension or columnar',
+    )
+    reparse_parser = subparsers.add_parser('reparse', help='extract the statistics from a directory of saved reports')
+    reparse_parser.add_argument('directory', help='the directory with the saved reports')
+    reparse_parser.add_argument('output', help='the JSON Lines output file, appended to when resuming')
+    reparse_parser.add_argument('--pattern', default='*.html', help='the glob pattern of the report file names')
+    reparse_parser.add_argument('--processes', type=int, help='the number of worker processes')
+    serve_parser = subparsers.add_parser('serve', help='serve the latest printer counters over HTTP/JSON')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='the address to listen on')
+    serve_parser.add_argument('--port', type=int, default=8080, help='the port to listen on')
+    serve_parser.add_argument(
+        '--max-age', type=float, default=60, help='the age in seconds after which a counter is read again',
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list = None) -> int:
+    """
+    Main function to run the selected command.
+
+    Args:
+        argv (list): The command line arguments, defaults to 'sys.argv'.
+
+    Returns:
+        int: The exit code of the command.
+    """
+    args = parse_args(argv)
+
+    from dotenv import load_dotenv
+
     load_dotenv()
-    main()
+
+    try:
+        if args.command == 'run-once':
+            run_once()
+            prune_archive()
+        elif args.command == 'poll':
+            return poll(args.snapshot)
+        elif args.command == 'send':
+            send_report(report_all())
+        elif args.command == 'export':
+            export_readings(args.path, args.export_format)
+        elif args.command == 'reparse':
+            reparse_reports(args.directory, args.output, args.pattern, args.processes)
+        elif args.command == 'serve':
+            serve(args.host, args.port, args.max_age)
+        else:
+            daemon()
+    except CreateReportError:
+        print(f'Unable to create report for printer {getenv("PRINTER_IP")}', file=sys.stderr)
+        return 1
+    finally:
+        save_poller_state()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,114 @@
+"""
+The collections of the tests for the 'utils.archive.py' module.
+"""
+from datetime import datetime
+
+import pytest
+
+from utils.archive import ReportArchive
+
+
+@pytest.fixture
+def archive(tmp_path) -> ReportArchive:
+    """
+    Fixture for creating a ReportArchive in a temporary directory with a 30 days retention.
+
+    Args:
+        tmp_path: The Pytest temporary directory fixture.
+
+    Returns:
+        ReportArchive: A ReportArchive instance configured for testing.
+    """
+    return ReportArchive(tmp_path / 'archive', retention_days=30)
+
+
+def test_store_and_load(archive: ReportArchive):
+    """
+    Test that a stored report is loaded back unchanged and stored compressed.
+
+    Args:
+        archive (ReportArchive): A ReportArchive instance configured for testing.
+    """
+    with open('tests/example_report.html') as file:
+        report = file.read()
+
+    report_hash = archive.store('10.0.0.1', report)
+
+    assert archive.load(report_hash) == report
+    stored = sum(path.stat().st_size for path in (archive.root / 'objects').glob('*/*'))
+    assert stored < len(report.encode('utf-8')) / 4
+
+
+def test_identical_reports_are_stored_once(archive: ReportArchive):
+    """
+    Test that identical reports share the stored content but keep their own index entries.
+
+    Args:
+        archive (ReportArchive): A ReportArchive instance configured for testing.
+    """
+    first = archive.store('10.0.0.1', 'report', now=100)
+    second = archive.store('10.0.0.1', 'report', now=200)
+    other = archive.store('10.0.0.2', 'report', now=300)
+
+    assert first == second == other
+    assert len(list((archive.root / 'objects').glob('*/*'))) == 1
+    assert [report_hash for _, report_hash in archive.history('10.0.0.1')] == [first, first]
+
+
+def test_history_time_range(archive: ReportArchive):
+    """
+    Test that the history is limited to the given time range.
+
+    Args:
+        archive (ReportArchive): A ReportArchive instance configured for testing.
+    """
+    for day in range(1, 4):
+        archive.store('10.0.0.1', f'report {day}', now=datetime(2022, 10, day).timestamp())
+
+    result = list(archive.history('10.0.0.1', start=datetime(2022, 10, 2), end=datetime(2022, 10, 3)))
+
+    assert len(result) == 1
+    assert archive.load(result[0][1]) == 'report 2'
+    assert list(archive.history('10.0.0.9')) == []
+
+
+def test_prune_removes_reports_older_than_retention(archive: ReportArchive):
+    """
+    Test that pruning removes old index entries and the reports no longer referenced.
+
+    Args:
+        archive (ReportArchive): A ReportArchive instance configured for testing.
+    """
+    day = 24 * 60 * 60
+    old = archive.store('10.0.0.1', 'old report', now=0)
+    shared = archive.store('10.0.0.1', 'shared report', now=0)
+    archive.store('10.0.0.2', 'shared report', now=40 * day)
+    archive.store('10.0.0.3', 'gone', now=0)
+
+    removed = archive.prune(now=45 * day)
+
+    assert removed == 2
+    assert archive.load(shared) == 'shared report'
+    with pytest.raises(FileNotFoundError):
+        archive.load(old)
+    assert list(archive.history('10.0.0.1')) == []
+    assert not (archive.root / 'index' / '10.0.0.3.log').exists()
+
+
+def test_prune_keeps_reports_served_recently(archive: ReportArchive):
+    """
+    Test that a report is kept while it was served within the retention period, even if the entry
+    referencing it is not in an index yet, as when another process stores it during pruning.
+
+    Args:
+        archive (ReportArchive): A ReportArchive instance configured for testing.
+    """
+    day = 24 * 60 * 60
+    report_hash = archive.store('10.0.0.1', 'report', now=0)
+    archive.store('10.0.0.2', 'report', now=44 * day)
+    (archive.root / 'index' / '10.0.0.2.log').unlink()
+
+    removed = archive.prune(now=45 * day)
+
+    assert removed == 0
+    assert archive.load(report_hash) == 'report'
@@ -0,0 +1,157 @@
+"""
+The collections of the tests for the 'utils.export.py' module.
+"""
+import csv
+from datetime import datetime, timezone
+import io
+import json
+
+import pytest
+
+from utils import export
+from utils.export import ColumnarReader
+
+
+@pytest.fixture
+def readings() -> list:
+    """
+    Fixture for creating example readings of two devices.
+
+    Returns:
+        list: The example readings.
+    """
+    return [
+        {
+            'time': datetime(2022, 10, day, 12, tzinfo=timezone.utc),
+            'ip_address': f'10.0.0.{device}',
+            'serial_number': f'70154{device}HH0NLT2',
+            'counter': 113013 + 100 * day + device,
+        }
+        for day in range(1, 4) for device in range(1, 3)
+    ]
+
+
+def test_columnar_round_trip(readings: list, tmp_path):
+    """
+    Test that the columnar file is read back with the same readings.
+
+    Args:
+        readings (list): The example readings.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    path = tmp_path / 'readings.kmc'
+
+    count = export.write_columnar(readings, path)
+
+    with ColumnarReader(path) as reader:
+        result = list(reader.readings())
+        assert len(reader) == count == 6
+        assert len(reader.strings) == 4
+    assert result == readings
+
+
+def test_columnar_column_scan(readings: list, tmp_path):
+    """
+    Test reading single columns without building the readings.
+
+    Args:
+        readings (list): The example readings.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    path = tmp_path / 'readings.kmc'
+    export.write_columnar(readings, path)
+
+    with ColumnarReader(path) as reader:
+        assert sum(reader.column('counter')) == sum(reading['counter'] for reading in readings)
+        assert reader.string_column('serial_number') == [reading['serial_number'] for reading in readings]
+
+
+def test_columnar_empty_file(tmp_path):
+    """
+    Test writing and reading a file without readings.
+
+    Args:
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    path = tmp_path / 'readings.kmc'
+    export.write_columnar([], path)
+
+    with ColumnarReader(path) as reader:
+        assert len(reader) == 0
+        assert list(reader.readings()) == []
+
+
+def test_columnar_reader_rejects_other_files(tmp_path):
+    """
+    Test that a file in another format raises a ValueError.
+
+    Args:
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    path = tmp_path / 'readings.csv'
+    path.write_bytes(b'time,ip_address,serial_number,counter\n')
+
+    with pytest.raises(ValueError) as error:
+        ColumnarReader(path)
+
+    assert error.type == ValueError
+
+
+def test_write_jsonl(readings: list):
+    """
+    Test writing the readings as JSON Lines.
+
+    Args:
+        readings (list): The example readings.
+    """
+    file = io.StringIO()
+
+    count = export.write_jsonl(readings, file)
+
+    lines = file.getvalue().splitlines()
+    assert count == len(lines) == 6
+    assert json.loads(lines[0]) == {
+        'time': '2022-10-01T12:00:00+00:00',
+        'ip_address': '10.0.0.1',
+        'serial_number': '701541HH0NLT2',
+        'counter': 113114,
+    }
+
+
+def test_write_csv(readings: list):
+    """
+    Test writing the readings as CSV.
+
+    Args:
+        readings (list): The example readings.
+    """
+    file = io.StringIO(newline='')
+
+    count = export.write_csv(readings, file)
+
+    rows = list(csv.DictReader(io.StringIO(file.getvalue())))
+    assert count == len(rows) == 6
+    assert rows[-1]['serial_number'] == '701542HH0NLT2'
+    assert rows[-1]['counter'] == '113315'
+
+
+def test_text_formats_write_utc_times(readings: list, tmp_path):
+    """
+    Test that JSON Lines and CSV write the same UTC times the columnar reader returns, also for local times.
+
+    Args:
+        readings (list): The example readings.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    local = [dict(reading, time=reading['time'].astimezone().replace(tzinfo=None)) for reading in readings]
+    export.write_columnar(local, tmp_path / 'readings.kmc')
+    jsonl, csv_file = io.StringIO(), io.StringIO(newline='')
+
+    export.write_jsonl(local, jsonl)
+    export.write_csv(local, csv_file)
+
+    with ColumnarReader(tmp_path / 'readings.kmc') as reader:
+        expected_times = [reading['time'].isoformat() for reading in reader.readings()]
+    assert [json.loads(line)['time'] for line in jsonl.getvalue().splitlines()] == expected_times
+    assert [row['time'] for row in csv.DictReader(io.StringIO(csv_file.getvalue()))] == expected_times
+    assert expected_times[0] == '2022-10-01T12:00:00+00:00'
@@ -0,0 +1,100 @@
+"""
+The collections of the tests for the 'utils.health.py' module.
+"""
+from utils import health
+from utils.health import DeviceHealth, HealthTracker
+
+
+def test_circuit_opens_after_failure_threshold():
+    """
+    Test that the circuit opens after the failure threshold and skips the device until the probe time.
+    """
+    device = DeviceHealth(failure_threshold=2, base_delay=10)
+
+    device.record_failure(now=100)
+    assert device.state == health.CLOSED
+    assert device.allow(now=100)
+
+    device.record_failure(now=100)
+    assert device.state == health.OPEN
+    assert not device.allow(now=109)
+    assert device.allow(now=110)
+    assert device.state == health.HALF_OPEN
+
+
+def test_failed_probe_doubles_delay():
+    """
+    Test that every failed probe doubles the delay until the next probe, up to the maximum delay.
+    """
+    device = DeviceHealth(failure_threshold=1, base_delay=10, max_delay=30)
+    delays = []
+
+    now = 0
+    for _ in range(4):
+        device.allow(now=now)
+        device.record_failure(now=now)
+        delays.append(device.next_probe - now)
+        now = device.next_probe
+
+    assert delays == [10, 20, 30, 30]
+
+
+def test_success_closes_circuit():
+    """
+    Test that a successful probe closes the circuit and resets the backoff.
+    """
+    device = DeviceHealth(failure_threshold=1, base_delay=10)
+    device.record_failure(now=0)
+    device.allow(now=10)
+
+    device.record_success(now=10)
+
+    assert device.state == health.CLOSED
+    assert device.failures == device.opened == 0
+    assert device.last_seen == 10
+
+
+def test_tracker_save_and_load(tmp_path):
+    """
+    Test that the health of the devices survives saving and loading the file.
+
+    Args:
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    tracker = HealthTracker(tmp_path / 'health.json', failure_threshold=1)
+    tracker.get('10.0.0.1').record_failure(now=0)
+    tracker.get('10.0.0.2').record_success(now=5)
+    tracker.save()
+
+    loaded = HealthTracker(tmp_path / 'health.json')
+
+    assert loaded.get('10.0.0.1').to_dict() == tracker.get('10.0.0.1').to_dict()
+    assert loaded.get('10.0.0.2').last_seen == 5
+
+
+def test_timeout_adapts_to_latency_history():
+    """
+    Test that the timeout is the default until enough latencies are recorded, then the scaled 95th percentile.
+    """
+    device = DeviceHealth()
+    assert device.timeout(factor=2, default=10) == 10
+
+    for latency in range(1, 21):
+        device.record_latency(latency / 10)
+
+    assert device.latency_percentile(95) == 2.0
+    assert device.timeout(factor=2, default=10) == 4.0
+    assert device.timeout(factor=100, maximum=30) == 30
+
+
+def test_latency_history_is_bounded():
+    """
+    Test that only the most recent latencies are kept.
+    """
+    device = DeviceHealth()
+
+    for latency in range(health.LATENCY_HISTORY * 2):
+        device.record_latency(latency)
+
+    assert len(device.latencies) == health.LATENCY_HISTORY
+    assert device.latencies[0] == health.LATENCY_HISTORY
@@ -0,0 +1,73 @@
+"""
+The collections of the tests for the 'utils.history.py' module.
+"""
+import pytest
+
+from utils.history import Reading, ReadingHistory, ReadingRing
+
+
+def test_ring_keeps_most_recent_readings():
+    """
+    Test that a full ring buffer overwrites the oldest readings.
+    """
+    ring = ReadingRing(3)
+
+    for time in range(5):
+        ring.append(time, 100 + time)
+
+    assert len(ring) == 3
+    assert list(ring) == [Reading(2, 102), Reading(3, 103), Reading(4, 104)]
+    assert ring[0] == Reading(2, 102)
+    assert ring.latest() == ring[-1] == Reading(4, 104)
+
+
+def test_ring_index_out_of_range():
+    """
+    Test that reading a position without a reading raises an IndexError.
+    """
+    ring = ReadingRing(3)
+    ring.append(1, 1)
+
+    assert ReadingRing(3).latest() is None
+    with pytest.raises(IndexError):
+        ring[1]
+    with pytest.raises(IndexError):
+        ring[-2]
+
+
+def test_reading_uses_slots():
+    """
+    Test that the readings do not carry a dictionary.
+    """
+    assert not hasattr(Reading(1, 1), '__dict__')
+    assert not hasattr(ReadingRing(1), '__dict__')
+
+
+def test_history_per_device():
+    """
+    Test that every device has its own ring buffer.
+    """
+    history = ReadingHistory(capacity=2)
+
+    history.append('10.0.0.1', 1, 100)
+    history.append('10.0.0.2', 1, 200)
+    history.append('10.0.0.1', 2, 110)
+
+    assert len(history) == 2
+    assert '10.0.0.1' in history
+    assert history.get('10.0.0.3') is None
+    assert [reading.counter for reading in history.get('10.0.0.1')] == [100, 110]
+
+
+def test_history_memory_per_reading():
+    """
+    Test that a full history costs less than 50 bytes per reading.
+    """
+    devices, capacity = 200, 1000
+    history = ReadingHistory(capacity)
+
+    for device in range(devices):
+        for time in range(capacity):
+            history.append(f'10.0.{device // 256}.{device % 256}', 1666000000 + time, 113013 + time)
+
+    assert history.nbytes() / (devices * capacity) < 50
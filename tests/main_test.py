@@ -0,0 +1,447 @@
+"""
+The collections of the tests for the 'main.py' module.
+"""
+import json
+import sys
+from unittest.mock import patch
+
+import pytest
+from pytest import MonkeyPatch
+
+import main
+from utils.exceptions import CreateReportError, InvalidAddressError, ReportError
+from utils.export import ColumnarReader
+from utils.poller import PollResult
+
+
+@pytest.fixture(autouse=True)
+def environment(monkeypatch: MonkeyPatch, tmp_path):
+    """
+    A Pytest fixture that sets the scheduling environment variables and runs the test
+    in a temporary directory without a '.env' file.
+
+    Args:
+        monkeypatch: The Pytest monkeypatch fixture.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv('SEND_INTERVAL', '1')
+    monkeypatch.setenv('SEND_EVERY', 'Year')
+    monkeypatch.setenv('PRINTER_IP', '192.168.0.1')
+    monkeypatch.setenv('SMTP_SERVER', 'smtp.example.com')
+    monkeypatch.setenv('EMAIL_LOGIN', 'sender@example.com')
+    monkeypatch.setenv('EMAIL_PASSWORD', 'password')
+    monkeypatch.setenv('SMTP_PORT', '25')
+    monkeypatch.setenv('ENCRYPTION', 'No')
+    monkeypatch.setenv('EMAIL_RECEIVER', 'receiver_email@gmail.com')
+    monkeypatch.setattr('dotenv.load_dotenv', lambda: None)
+    monkeypatch.setattr(main, '_poller', None)
+
+
+def sent_body(mock_send_many: patch) -> str:
+    """
+    Get the bodies of the emails sent in the last call of the Email.send_many mock.
+
+    Args:
+        mock_send_many (patch): A mock for the Email.send_many method.
+
+    Returns:
+        str: The bodies of the sent emails.
+    """
+    return '\n'.join(body for _, _, body in mock_send_many.call_args.args[0])
+
+
+def test_heavy_modules_are_not_imported_on_startup(monkeypatch: MonkeyPatch):
+    """
+    Test that importing the script does not import the network, parsing or Windows-only modules.
+
+    Args:
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    for module in ('requests', 'bs4', 'dateutil', 'winreg', 'utils.autostart', 'main'):
+        monkeypatch.delitem(sys.modules, module, raising=False)
+
+    __import__('main')
+
+    for module in ('requests', 'bs4', 'dateutil', 'winreg', 'utils.autostart'):
+        assert module not in sys.modules
+
+
+@pytest.mark.parametrize('next_send, expected_result', (('2000', True), ('9999', False)))
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt', return_value=PollResult('701545HH0NLT2', '113013'))
+def test_run_once(
+        mock_read_device: patch, mock_send_many: patch, monkeypatch: MonkeyPatch,
+        next_send: str, expected_result: bool
+):
+    """
+    Test that a single cycle sends the report only when it is due.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        monkeypatch: The Pytest monkeypatch fixture.
+        next_send (str): The value of the 'NEXT_SEND' environment variable.
+        expected_result (bool): Whether the report is expected to be sent.
+    """
+    monkeypatch.setenv('NEXT_SEND', next_send)
+
+    result = main.main(['run-once'])
+
+    assert result == 0
+    assert mock_send_many.called is expected_result
+    if expected_result:
+        assert '701545HH0NLT2' in sent_body(mock_send_many)
+        assert main.getenv('NEXT_SEND') != next_send
+
+
+@pytest.mark.parametrize('command', (['poll'], ['send']))
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt', side_effect=CreateReportError)
+def test_command_returns_error_code_when_report_fails(mock_read_device: patch, mock_send_many: patch, command: list):
+    """
+    Test that a failed report makes the command return a non-zero exit code.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        command (list): The command line arguments.
+    """
+    assert main.main(command) == 1
+    mock_send_many.assert_not_called()
+
+
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt')
+def test_send_reports_printers_not_responding(mock_read_device: patch, mock_send_many: patch, monkeypatch: MonkeyPatch):
+    """
+    Test that a printer that does not respond does not hold back the report of the other printers.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    monkeypatch.setenv('PRINTER_IP', '10.0.0.1,10.0.0.2')
+
+    def attempt(ip_address: str, *args):
+        if ip_address == '10.0.0.1':
+            raise CreateReportError
+        return PollResult('701545HH0NLT2', '113013')
+
+    mock_read_device.side_effect = attempt
+
+    assert main.main(['send']) == 0
+
+    body = sent_body(mock_send_many)
+    assert '701545HH0NLT2' in body
+    assert 'Printer 10.0.0.1: not responding' in body
+
+
+@pytest.mark.parametrize('error', (ReportError, InvalidAddressError))
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt')
+def test_send_reports_unreadable_printers(
+        mock_read_device: patch, mock_send_many: patch, error: type, monkeypatch: MonkeyPatch,
+):
+    """
+    Test that a printer whose report cannot be read is listed as such instead of failing the whole report.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        error (type): The exception raised for the printer.
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    monkeypatch.setenv('PRINTER_IP', '10.0.0.1,10.0.0.2')
+
+    def attempt(ip_address: str, *args):
+        if ip_address == '10.0.0.1':
+            raise error
+        return PollResult('701545HH0NLT2', '113013')
+
+    mock_read_device.side_effect = attempt
+
+    assert main.main(['send']) == 0
+    assert main.main(['poll']) == 1
+
+    body = sent_body(mock_send_many)
+    assert '701545HH0NLT2' in body
+    assert 'Printer 10.0.0.1: report cannot be read' in body
+
+
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt', return_value=PollResult('701545HH0NLT2', '113013'))
+def test_send_ignores_schedule(mock_read_device: patch, mock_send_many: patch, monkeypatch: MonkeyPatch):
+    """
+    Test that the send command sends the report even if it is not due.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    monkeypatch.setenv('NEXT_SEND', '9999')
+
+    assert main.main(['send']) == 0
+    mock_send_many.assert_called_once()
+    assert '113013' in sent_body(mock_send_many)
+
+
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt')
+def test_run_once_sends_only_changes(mock_read_device: patch, mock_send_many: patch, monkeypatch: MonkeyPatch):
+    """
+    Test that in 'changes' mode only the printers that changed are sent, and nothing is sent without changes.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    monkeypatch.setenv('SEND_MODE', 'changes')
+    monkeypatch.setenv('PRINTER_IP', '10.0.0.1, 10.0.0.2')
+    readings = {'10.0.0.1': PollResult('SERIAL1', '100'), '10.0.0.2': PollResult('SERIAL2', '200')}
+    mock_read_device.side_effect = lambda ip_address, *args: readings[ip_address]
+
+    runs = ((None, {'SERIAL1', 'SERIAL2'}), (None, set()), ('250', {'SERIAL2'}))
+    for change_counter, expected_serial_numbers in runs:
+        if change_counter:
+            readings['10.0.0.2'] = PollResult('SERIAL2', change_counter)
+        monkeypatch.setenv('NEXT_SEND', '2000')
+        mock_send_many.reset_mock()
+
+        assert main.main(['run-once']) == 0
+
+        if expected_serial_numbers:
+            body = sent_body(mock_send_many)
+            assert {'SERIAL1', 'SERIAL2'} & set(body.split()) == expected_serial_numbers
+        else:
+            mock_send_many.assert_not_called()
+
+
+@pytest.mark.parametrize('file_name', ('readings.kmc', 'readings.jsonl', 'readings.csv'))
+@patch('utils.poller.Poller._attempt', return_value=PollResult('701545HH0NLT2', '113013'))
+def test_export(mock_read_device: patch, file_name: str, tmp_path):
+    """
+    Test that the export command writes the readings in the format matching the file extension.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        file_name (str): The name of the output file.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    path = tmp_path / file_name
+
+    assert main.main(['export', str(path)]) == 0
+    if path.suffix == '.kmc':
+        with ColumnarReader(path) as reader:
+            assert reader.strings == ['701545HH0NLT2', '192.168.0.1']
+    else:
+        assert '113013' in path.read_text()
+
+
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt')
+def test_send_routes_printers_per_receiver_and_server(
+        mock_read_device: patch, mock_send_many: patch, monkeypatch: MonkeyPatch, tmp_path
+):
+    """
+    Test that the printers are routed to their receivers with one connection per SMTP server.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        monkeypatch: The Pytest monkeypatch fixture.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    routes = tmp_path / 'routes.json'
+    routes.write_text(json.dumps({
+        'servers': {'relay': {'smtp_server': 'relay', 'port': 25, 'login': 'l', 'password': 'p', 'encryption': 'No'}},
+        'groups': {'accounting': ['10.0.0.1', 'SERIAL-10.0.0.2']},
+        'routes': [{'groups': ['accounting'], 'receivers': ['a@example.com', 'b@example.com'], 'server': 'relay'}],
+    }))
+    monkeypatch.setenv('ROUTES_FILE', str(routes))
+    monkeypatch.setenv('PRINTER_IP', '10.0.0.1,10.0.0.2,10.0.0.3')
+    mock_read_device.side_effect = lambda ip_address, *args: PollResult(f'SERIAL-{ip_address}', '100')
+
+    assert main.main(['send']) == 0
+
+    assert mock_send_many.call_count == 2
+    calls = {tuple(receiver for receiver, _, _ in call.args[0]): call.args[0] for call in mock_send_many.call_args_list}
+    assert set(calls) == {('a@example.com', 'b@example.com'), ('receiver_email@gmail.com',)}
+    assert 'SERIAL-10.0.0.2' in calls['a@example.com', 'b@example.com'][0][2]
+    assert 'SERIAL-10.0.0.3' not in calls['a@example.com', 'b@example.com'][0][2]
+    assert 'SERIAL-10.0.0.3' in calls['receiver_email@gmail.com', ][0][2]
+
+
+@pytest.mark.parametrize('failures, expected_sent', ((1, True), (2, False)))
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt')
+def test_run_once_tries_every_server(
+        mock_read_device: patch, mock_send_many: patch, failures: int, expected_sent: bool,
+        monkeypatch: MonkeyPatch, tmp_path,
+):
+    """
+    Test that a failing SMTP server does not keep the other servers from sending, and that the next send
+    is scheduled unless every server failed, so the emails already sent are not sent again.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        failures (int): The number of failing servers.
+        expected_sent (bool): Whether the report is expected to count as sent.
+        monkeypatch: The Pytest monkeypatch fixture.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    from smtplib import SMTPException
+
+    routes = tmp_path / 'routes.json'
+    routes.write_text(json.dumps({
+        'servers': {'relay': {'smtp_server': 'relay', 'port': 25, 'login': 'l', 'password': 'p', 'encryption': 'No'}},
+        'routes': [{'devices': ['10.0.0.1'], 'receivers': ['a@example.com'], 'server': 'relay'}],
+    }))
+    monkeypatch.setenv('ROUTES_FILE', str(routes))
+    monkeypatch.setenv('PRINTER_IP', '10.0.0.1,10.0.0.2')
+    monkeypatch.setenv('NEXT_SEND', '2000')
+    mock_read_device.side_effect = lambda ip_address, *args: PollResult(f'SERIAL-{ip_address}', '100')
+    mock_send_many.side_effect = [SMTPException('down')] * failures + [None] * (2 - failures)
+
+    if expected_sent:
+        assert main.main(['run-once']) == 0
+    else:
+        with pytest.raises(SMTPException):
+            main.main(['run-once'])
+
+    assert mock_send_many.call_count == 2
+    assert (main.getenv('NEXT_SEND') != '2000') == expected_sent
+
+
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt', return_value=PollResult('701545HH0NLT2', '113013'))
+def test_send_with_routes_file_defining_every_server(
+        mock_read_device: patch, mock_send_many: patch, monkeypatch: MonkeyPatch, tmp_path
+):
+    """
+    Test that the SMTP server of the environment may be left unset when the routes file defines every server.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        monkeypatch: The Pytest monkeypatch fixture.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    routes = tmp_path / 'routes.json'
+    routes.write_text(json.dumps({
+        'servers': {'relay': {'smtp_server': 'relay', 'port': 25, 'login': 'l', 'password': 'p', 'encryption': 'No'}},
+        'routes': [{'devices': ['192.168.0.1'], 'receivers': ['a@example.com'], 'server': 'relay'}],
+    }))
+    monkeypatch.setenv('ROUTES_FILE', str(routes))
+    monkeypatch.delenv('SMTP_SERVER')
+    monkeypatch.delenv('SMTP_PORT')
+    monkeypatch.delenv('EMAIL_RECEIVER')
+
+    assert main.main(['send']) == 0
+
+    mock_send_many.assert_called_once()
+
+
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt')
+def test_run_once_skips_unchanged_reports(mock_read_device: patch, mock_send_many: patch, monkeypatch: MonkeyPatch):
+    """
+    Test that in 'changes' mode the readings of a printer serving the report of its stored reading are not
+    updated, unless the printer is responding again, whatever the flag set by the reads of other commands.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    from utils.readings import ReadingStore
+
+    monkeypatch.setenv('SEND_MODE', 'changes')
+    monkeypatch.setenv('NEXT_SEND', '2000')
+    mock_read_device.return_value = PollResult('SERIAL1', '100', report_hash='first')
+    assert main.main(['run-once']) == 0
+    first_seen = ReadingStore('readings.json').devices['SERIAL1']['time']
+
+    store = ReadingStore('readings.json')
+    store.devices['SERIAL1']['time'] = 'skipped'
+    store.save()
+    monkeypatch.setenv('NEXT_SEND', '2000')
+    assert main.main(['run-once']) == 0
+    assert ReadingStore('readings.json').devices['SERIAL1']['time'] == 'skipped'
+
+    monkeypatch.setenv('NEXT_SEND', '2000')
+    mock_send_many.reset_mock()
+    mock_read_device.return_value = PollResult('SERIAL1', '150', unchanged=True, report_hash='second')
+    assert main.main(['run-once']) == 0
+    assert ReadingStore('readings.json').devices['SERIAL1']['counter'] == 150
+    assert 'SERIAL1' in sent_body(mock_send_many)
+
+    store = ReadingStore('readings.json')
+    store.devices['SERIAL1']['time'] = first_seen
+    store.devices['SERIAL1']['responding'] = False
+    store.save()
+    monkeypatch.setenv('NEXT_SEND', '2000')
+    mock_send_many.reset_mock()
+    assert main.main(['run-once']) == 0
+    assert ReadingStore('readings.json').devices['SERIAL1']['responding']
+    assert 'SERIAL1' in sent_body(mock_send_many)
+
+
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt', return_value=PollResult('SERIAL1', '100'))
+def test_run_once_keeps_changes_when_sending_fails(
+        mock_read_device: patch, mock_send_many: patch, monkeypatch: MonkeyPatch,
+):
+    """
+    Test that in 'changes' mode the readings are saved only after the changes are sent,
+    so a change is sent again by the next run if the email fails.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    from smtplib import SMTPException
+
+    monkeypatch.setenv('SEND_MODE', 'changes')
+    monkeypatch.setenv('NEXT_SEND', '2000')
+    mock_send_many.side_effect = SMTPException
+
+    with pytest.raises(SMTPException):
+        main.main(['run-once'])
+
+    mock_send_many.reset_mock(side_effect=True)
+    assert main.main(['run-once']) == 0
+    assert 'SERIAL1' in sent_body(mock_send_many)
+
+
+@pytest.mark.parametrize('command, pruned', ((['send'], False), (['run-once'], True)))
+@patch('utils.archive.ReportArchive.prune')
+@patch('utils.message.Email.send_many')
+@patch('utils.poller.Poller._attempt', return_value=PollResult('701545HH0NLT2', '113013'))
+def test_only_scheduled_cycles_prune_archive(
+        mock_read_device: patch, mock_send_many: patch, mock_prune: patch, command: list, pruned: bool,
+        monkeypatch: MonkeyPatch, tmp_path,
+):
+    """
+    Test that the report archive is pruned by the scheduled cycles only.
+
+    Args:
+        mock_read_device (patch): A mock for the request made by the poller.
+        mock_send_many (patch): A mock for the Email.send_many method.
+        mock_prune (patch): A mock for the ReportArchive.prune method.
+        command (list): The command line arguments.
+        pruned (bool): Whether the command is expected to prune the archive.
+        monkeypatch: The Pytest monkeypatch fixture.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    monkeypatch.setenv('ARCHIVE_DIR', str(tmp_path / 'archive'))
+    monkeypatch.setenv('NEXT_SEND', '2000')
+
+    assert main.main(command) == 0
+
+    assert mock_prune.called == pruned
@@ -100,3 +100,45 @@ def test_send_email_using_ssl(mock_message: patch, mock_smtp_ssl: patch, email_f
     context.login.assert_called_once_with(email_fixture.login, email_fixture.password)
     context.send_message.assert_called_once_with('message_body')
     mock_message.assert_called_once()
+
+
+@pytest.mark.parametrize(
+    'encryption, smtp_class', (('No', 'smtplib.SMTP'), ('TLS', 'smtplib.SMTP'), ('SSL', 'smtplib.SMTP_SSL')),
+)
+def test_send_many_uses_single_connection(encryption: str, smtp_class: str, email_fixture: Email):
+    """
+    Test that many emails are sent to their receivers over a single SMTP connection.
+
+    Args:
+        encryption (str): The encryption type ('No', 'TLS' or 'SSL').
+        smtp_class (str): The SMTP class expected for the encryption.
+        email_fixture (Email): An Email instance configured for testing.
+    """
+    email_fixture.encryption = encryption
+
+    with patch(smtp_class) as mock_smtp:
+        email_fixture.send_many([
+            ('first@gmail.com', 'title', 'first content'),
+            ('second@gmail.com', 'title', 'second content'),
+        ])
+
+    mock_smtp.assert_called_once_with(email_fixture.smtp_server, email_fixture.port)
+    context = mock_smtp.return_value.__enter__.return_value
+    context.login.assert_called_once_with(email_fixture.login, email_fixture.password)
+    receivers = [call.args[0]['To'] for call in context.send_message.call_args_list]
+    assert receivers == ['first@gmail.com', 'second@gmail.com']
+    assert context.starttls.called is (encryption == 'TLS')
+
+
+@patch('smtplib.SMTP')
+def test_send_many_without_messages(mock_smtp: patch, email_fixture: Email):
+    """
+    Test that no connection is made without emails to send.
+
+    Args:
+        mock_smtp (patch): A mock for the SMTP class.
+        email_fixture (Email): An Email instance configured for testing.
+    """
+    email_fixture.send_many([])
+
+    mock_smtp.assert_not_called()
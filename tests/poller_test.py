@@ -0,0 +1,386 @@
+"""
+The collections of the tests for the 'utils.poller.py' module.
+"""
+from threading import Lock
+from time import monotonic, sleep
+from unittest.mock import patch
+
+import pytest
+from pytest import MonkeyPatch
+
+from utils.exceptions import (
+    CreateReportError, DeadlineExceededError, DeviceUnavailableError, InvalidAddressError, ReportError,
+)
+from utils.health import HealthTracker
+from utils.poller import Poller
+from utils.ratelimit import RateLimiter
+
+
+@patch('utils.printer.Device.get_counter', return_value='113013')
+@patch('utils.printer.Device.get_serial_number', return_value='701545HH0NLT2')
+@patch('utils.printer.Device.create_report')
+def test_read_records_success(mock_create_report: patch, mock_serial_number: patch, mock_counter: patch):
+    """
+    Test that a successful read returns the statistics and marks the device as seen.
+
+    Args:
+        mock_create_report (patch): A mock for the create_report method.
+        mock_serial_number (patch): A mock for the get_serial_number method.
+        mock_counter (patch): A mock for the get_counter method.
+    """
+    poller = Poller()
+
+    assert poller.read('10.0.0.1') == ('701545HH0NLT2', '113013')
+    assert poller.health.get('10.0.0.1').last_seen is not None
+
+
+@patch('utils.printer.Device.get_counter', autospec=True)
+@patch('utils.printer.Device.get_serial_number', return_value='701545HH0NLT2')
+@patch('utils.printer.Device.create_report')
+def test_read_passes_verify_rate(mock_create_report: patch, mock_serial_number: patch, mock_counter: patch):
+    """
+    Test that the verification rate of the poller is passed to the devices.
+
+    Args:
+        mock_create_report (patch): A mock for the create_report method.
+        mock_serial_number (patch): A mock for the get_serial_number method.
+        mock_counter (patch): A mock for the get_counter method.
+    """
+    rates = []
+    mock_counter.side_effect = lambda device: rates.append(device.verify_rate) or '113013'
+
+    Poller(verify_rate=0.5).read('10.0.0.1')
+
+    assert rates == [0.5]
+
+
+@patch('utils.printer.Device.create_report', side_effect=CreateReportError)
+def test_read_skips_device_with_open_circuit(mock_create_report: patch):
+    """
+    Test that a device with an open circuit is skipped without a request.
+
+    Args:
+        mock_create_report (patch): A mock for the create_report method.
+    """
+    poller = Poller(HealthTracker(failure_threshold=1))
+
+    with pytest.raises(CreateReportError):
+        poller.read('10.0.0.1')
+    with pytest.raises(DeviceUnavailableError) as error:
+        poller.read('10.0.0.1')
+
+    assert error.type == DeviceUnavailableError
+    mock_create_report.assert_called_once()
+
+
+@patch('utils.printer.Device.get_counter', side_effect=ReportError)
+@patch('utils.printer.Device.create_report')
+def test_poll_records_unreadable_report_as_failure(mock_create_report: patch, mock_counter: patch):
+    """
+    Test that an unreadable report and an invalid address are per-printer failures recorded in the health.
+
+    Args:
+        mock_create_report (patch): A mock for the create_report method.
+        mock_counter (patch): A mock for the get_counter method.
+    """
+    poller = Poller()
+
+    results = poller.poll(['10.0.0.1', 'not-an-address'])
+
+    assert isinstance(results['10.0.0.1'], ReportError)
+    assert isinstance(results['not-an-address'], InvalidAddressError)
+    assert poller.health.get('10.0.0.1').failures == 1
+    assert poller.health.get('not-an-address').failures == 1
+
+
+class SlowDevice:
+    """
+    A mock of the Device class answering after a delay set per IP address and request number.
+
+    Attributes:
+        delays (dict): The delays in seconds of the consecutive requests, keyed by IP address.
+        timeouts (list): The timeouts the devices were created with.
+        unchanged (bool): Whether the report is identical to the previous one, never for the mock.
+        report_hash (str): The hash of the report, unknown for the mock.
+    """
+    delays = {}
+    timeouts = []
+    unchanged = False
+    report_hash = None
+    _lock = Lock()
+
+    def __init__(self, ip_address: str, timeout: float = None, **kwargs):
+        """
+        Initialize the mock with the IP address and the timeout of the device.
+
+        Args:
+            ip_address (str): The IP address of the device.
+            timeout (float): The timeout of the requests to the device.
+            **kwargs: The other arguments of the Device class.
+        """
+        self.ip_address = ip_address
+        with self._lock:
+            self.timeouts.append(timeout)
+            delays = self.delays[ip_address]
+            self.delay = delays.pop(0) if len(delays) > 1 else delays[0]
+
+    def __enter__(self):
+        """Simulate the request to the device"""
+        sleep(self.delay)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Implemented to use SlowDevice class as a context manager"""
+
+    def get_serial_number(self) -> str:
+        """Return the IP address as the serial number"""
+        return self.ip_address
+
+    def get_counter(self) -> str:
+        """Return the delay as the counter"""
+        return str(self.delay)
+
+    def get_snapshot(self) -> dict:
+        """Return the IP address, serial number and counter as the snapshot"""
+        return {'ip_address': self.ip_address, 'serial_number': self.ip_address, 'counter': str(self.delay)}
+
+
+@pytest.fixture
+def slow_device(monkeypatch):
+    """
+    A Pytest fixture that replaces the Device class used by the poller with SlowDevice.
+
+    Args:
+        monkeypatch: The Pytest monkeypatch fixture.
+
+    Returns:
+        type: The SlowDevice class.
+    """
+    monkeypatch.setattr('utils.poller.Device', SlowDevice)
+    SlowDevice.delays = {}
+    SlowDevice.timeouts = []
+    return SlowDevice
+
+
+def test_poll_marks_devices_missed_by_deadline(slow_device: type):
+    """
+    Test that the poll cycle ends at the deadline and marks the pending devices as missed.
+
+    Args:
+        slow_device (type): The SlowDevice class.
+    """
+    slow_device.delays = {'10.0.0.1': [0], '10.0.0.2': [1]}
+    start = monotonic()
+
+    result = Poller().poll(['10.0.0.1', '10.0.0.2'], deadline=0.2)
+
+    assert monotonic() - start < 0.5
+    assert result['10.0.0.1'] == ('10.0.0.1', '0')
+    assert isinstance(result['10.0.0.2'], DeadlineExceededError)
+
+
+def test_poll_skips_devices_with_open_circuit(slow_device: type):
+    """
+    Test that the poll cycle does not make requests to devices with an open circuit.
+
+    Args:
+        slow_device (type): The SlowDevice class.
+    """
+    slow_device.delays = {'10.0.0.1': [0]}
+    poller = Poller(HealthTracker(failure_threshold=1))
+    poller.health.get('10.0.0.2').record_failure()
+
+    result = poller.poll(['10.0.0.1', '10.0.0.2'])
+
+    assert result['10.0.0.1'] == ('10.0.0.1', '0')
+    assert isinstance(result['10.0.0.2'], DeviceUnavailableError)
+    assert len(slow_device.timeouts) == 1
+
+
+def test_poll_adapts_timeout_to_latency_history(slow_device: type):
+    """
+    Test that the request timeout is derived from the latency history of the device.
+
+    Args:
+        slow_device (type): The SlowDevice class.
+    """
+    slow_device.delays = {'10.0.0.1': [0]}
+    poller = Poller(timeout_factor=2)
+    for _ in range(10):
+        poller.health.get('10.0.0.1').record_latency(2.0)
+
+    poller.poll(['10.0.0.1'])
+
+    assert slow_device.timeouts == [4.0]
+
+
+def test_poll_hedges_slow_device(slow_device: type):
+    """
+    Test that a device slower than usual gets a second request and the first answer wins.
+
+    Args:
+        slow_device (type): The SlowDevice class.
+    """
+    slow_device.delays = {'10.0.0.1': [1, 0]}
+    poller = Poller()
+    for _ in range(10):
+        poller.health.get('10.0.0.1').record_latency(0.05)
+    start = monotonic()
+
+    result = poller.poll(['10.0.0.1'], deadline=2, hedge=True)
+
+    assert monotonic() - start < 0.5
+    assert result['10.0.0.1'] == ('10.0.0.1', '0')
+    assert len(slow_device.timeouts) == 2
+
+
+def test_poll_respects_subnet_concurrency(slow_device: type):
+    """
+    Test that the devices of a full subnet wait for their turn while the other subnets are read in parallel.
+
+    Args:
+        slow_device (type): The SlowDevice class.
+    """
+    slow_device.delays = {'10.0.0.1': [0.3], '10.0.0.2': [0.3], '10.0.1.1': [0.3]}
+    poller = Poller(limiter=RateLimiter(subnet_concurrency=1))
+
+    result = poller.poll(['10.0.0.1', '10.0.0.2', '10.0.1.1'], deadline=0.45)
+
+    assert result['10.0.0.1'] == ('10.0.0.1', '0.3')
+    assert result['10.0.1.1'] == ('10.0.1.1', '0.3')
+    assert isinstance(result['10.0.0.2'], DeadlineExceededError)
+
+
+def test_busy_subnet_does_not_hold_up_other_subnets(slow_device: type):
+    """
+    Test that the printers of idle subnets are read while the printers of a busy subnet wait for their turn.
+
+    Args:
+        slow_device (type): The SlowDevice class.
+    """
+    busy = [f'10.0.0.{host}' for host in range(1, 41)]
+    slow_device.delays = {ip_address: [0.1] for ip_address in [*busy, '10.0.1.1', '10.0.2.1']}
+    poller = Poller(max_workers=4, limiter=RateLimiter(subnet_concurrency=1))
+
+    result = poller.poll([*busy, '10.0.1.1', '10.0.2.1'], deadline=0.5)
+
+    assert result['10.0.1.1'] == ('10.0.1.1', '0.1')
+    assert result['10.0.2.1'] == ('10.0.2.1', '0.1')
+    assert isinstance(result[busy[-1]], DeadlineExceededError)
+
+
+def test_poll_does_not_hedge_device_limited_to_one_request(slow_device: type):
+    """
+    Test that a printer limited to a single request in flight gets a single request when hedging.
+
+    Args:
+        slow_device (type): The SlowDevice class.
+    """
+    slow_device.delays = {'10.0.0.1': [0.3, 0]}
+    poller = Poller(limiter=RateLimiter(device_concurrency=1))
+    for _ in range(10):
+        poller.health.get('10.0.0.1').record_latency(0.05)
+
+    result = poller.poll(['10.0.0.1'], deadline=2, hedge=True)
+    sleep(0.1)
+
+    assert result['10.0.0.1'] == ('10.0.0.1', '0.3')
+    assert len(slow_device.timeouts) == 1
+
+
+def test_poll_fetches_pages_within_device_concurrency(monkeypatch: MonkeyPatch):
+    """
+    Test that the reports of a printer are fetched with as many connections as its concurrency cap allows.
+
+    Args:
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    devices = []
+
+    class RecordingDevice(SlowDevice):
+        """A SlowDevice recording the arguments it was created with"""
+        def __init__(self, ip_address: str, **kwargs):
+            super().__init__(ip_address, **kwargs)
+            devices.append(kwargs)
+
+    monkeypatch.setattr('utils.poller.Device', RecordingDevice)
+    SlowDevice.delays = {'10.0.0.1': [0]}
+    SlowDevice.timeouts = []
+    poller = Poller(limiter=RateLimiter(device_concurrency=2), pages=['supplies', 'status'])
+
+    result = poller.poll(['10.0.0.1'])
+
+    assert result['10.0.0.1'] == ('10.0.0.1', '0')
+    assert devices[0]['pages'] == ('statistics', 'supplies', 'status')
+    assert devices[0]['concurrency'] == 2
+    assert poller.snapshots['10.0.0.1']['counter'] == '0'
+
+
+def test_unchanged_report_is_flagged_between_runs(monkeypatch: MonkeyPatch, tmp_path):
+    """
+    Test that a report identical to the one of the previous run is flagged, with the memo kept in a file.
+
+    Args:
+        monkeypatch: The Pytest monkeypatch fixture.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    with open('tests/example_report.html') as file:
+        content = file.read()
+
+    class Response:
+        """A response of the printer"""
+        status_code = 200
+        text = content
+
+    monkeypatch.setattr('requests.Session.get', lambda session, url, **kwargs: Response())
+    memo_path = tmp_path / 'report_memo.json'
+
+    first = Poller(memo_path=memo_path)
+    first_result = first.poll(['10.0.0.1'])['10.0.0.1']
+    assert not first_result.unchanged
+    first.save()
+
+    second = Poller(memo_path=memo_path)
+    with patch('utils.report.get_counter') as mock_counter:
+        result = second.poll(['10.0.0.1'])['10.0.0.1']
+
+    assert result == ('701545HH0NLT2', '113013')
+    assert result.unchanged
+    assert result.report_hash == first_result.report_hash is not None
+    mock_counter.assert_not_called()
+
+
+def test_unknown_report_page_is_rejected_upfront():
+    """
+    Test that a poller with an unknown report name cannot be created.
+    """
+    with pytest.raises(ValueError) as error:
+        Poller(pages=['supplise'])
+
+    assert error.type == ValueError
+
+
+def test_missing_extra_report_keeps_counter(monkeypatch: MonkeyPatch):
+    """
+    Test that a printer without the supplies report is still read and its health is not affected.
+
+    Args:
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    with open('tests/example_report.html') as file:
+        content = file.read()
+
+    class Response:
+        """A response of the printer"""
+        def __init__(self, url: str):
+            self.status_code = 404 if 'supplies' in url else 200
+            self.text = content
+
+    monkeypatch.setattr('requests.Session.get', lambda session, url, **kwargs: Response(url))
+    poller = Poller(pages=['supplies'])
+
+    result = poller.poll(['10.0.0.1'])
+
+    assert result['10.0.0.1'] == ('701545HH0NLT2', '113013')
+    assert poller.snapshots['10.0.0.1']['supplies'] is None
+    assert poller.health.get('10.0.0.1').failures == 0
@@ -9,7 +9,9 @@ from pytest import fixture, MonkeyPatch
 
 from utils.exceptions import InvalidAddressError, CreateReportError, ReportError
 
-from utils.printer import Device
+from utils.archive import ReportArchive
+from utils.printer import Device, PAGES, check_pages
+from utils.report import ReportMemo
 
 
 class RequestsMock:
@@ -55,12 +57,14 @@ class RequestsMock:
 @pytest.fixture(autouse=True)
 def no_requests(monkeypatch: MonkeyPatch):
     """
-    A Pytest fixture that monkeypatches the requests.get method to use the RequestsMock class.
+    A Pytest fixture that monkeypatches the requests.get and requests.Session.get methods to use the RequestsMock class.
 
     Args:
         monkeypatch: The Pytest monkeypatch fixture.
     """
-    monkeypatch.setattr(requests, 'get', RequestsMock().get)
+    mock = RequestsMock()
+    monkeypatch.setattr(requests, 'get', mock.get)
+    monkeypatch.setattr(requests.Session, 'get', lambda session, *args, **kwargs: mock.get(*args, **kwargs))
 
 
 def test_use_device_as_context_manager(no_requests: fixture):
@@ -205,3 +209,151 @@ def test_unsuccessfully_get_serial_number():
         device.get_serial_number()
 
     assert error.type == ReportError
+
+
+def test_create_report_when_device_does_not_respond(monkeypatch: MonkeyPatch):
+    """
+    Test that a connection error is raised as a CreateReportError.
+
+    Args:
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    def get(*args, **kwargs):
+        raise requests.ConnectionError
+
+    monkeypatch.setattr(requests, 'get', get)
+
+    with pytest.raises(CreateReportError) as error:
+        Device('127.0.0.1').create_report()
+
+    assert error.type == CreateReportError
+
+
+def test_create_report_stores_report_in_archive(tmp_path):
+    """
+    Test that the fetched report is stored in the archive.
+
+    Args:
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    archive = ReportArchive(tmp_path)
+
+    with Device('10.0.0.1', archive=archive) as device:
+        pass
+
+    (_, report_hash), = archive.history('10.0.0.1')
+    assert archive.load(report_hash) == device._report
+
+
+def test_unchanged_report_is_not_parsed_again():
+    """
+    Test that an identical report is flagged as unchanged and its values come from the memo.
+    """
+    memo = ReportMemo()
+
+    with Device('10.0.0.1', memo=memo) as device:
+        first = device.get_serial_number(), device.get_counter()
+    assert not device.unchanged
+
+    with patch('utils.report.get_counter') as mock_counter, \
+            patch('utils.report.get_serial_number') as mock_serial_number:
+        with Device('10.0.0.1', memo=memo) as device:
+            second = device.get_serial_number(), device.get_counter()
+
+    assert device.unchanged
+    assert second == first
+    mock_counter.assert_not_called()
+    mock_serial_number.assert_not_called()
+
+
+def test_snapshot_of_many_reports_over_one_session(monkeypatch: MonkeyPatch):
+    """
+    Test that all the reports are fetched over a single session and combined into a snapshot.
+
+    Args:
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    with open('tests/example_report.html') as file:
+        statistics = file.read()
+    contents = {
+        PAGES['statistics']: statistics,
+        PAGES['supplies']: '<table><tr><td>Black Toner</td><td>80%</td></tr></table>',
+        PAGES['status']: '<table><tr><td>Status</td><td>Ready</td></tr></table>',
+    }
+    sessions = set()
+
+    def get(session, url, **kwargs):
+        sessions.add(id(session))
+        response = RequestsMock()
+        response.status_code = 200
+        response.text = contents[url.split('/', 3)[3]]
+        return response
+
+    monkeypatch.setattr(requests.Session, 'get', get)
+
+    with Device('10.0.0.1', pages=('statistics', 'supplies', 'status'), concurrency=3) as device:
+        snapshot = device.get_snapshot()
+
+    assert len(sessions) == 1
+    assert device._session is None
+    assert snapshot == {
+        'ip_address': '10.0.0.1',
+        'serial_number': '701545HH0NLT2',
+        'counter': '113013',
+        'supplies': {'Black Toner': '80%'},
+        'status': {'Status': 'Ready'},
+    }
+
+
+def test_unknown_report_page():
+    """
+    Test that an unknown report name raises a ValueError.
+    """
+    check_pages(('statistics', 'supplies', 'status'))
+
+    with pytest.raises(ValueError) as error:
+        check_pages(('statistics', 'unknown'))
+
+    assert error.type == ValueError
+
+
+def test_unavailable_extra_report_does_not_fail_device(monkeypatch: MonkeyPatch):
+    """
+    Test that a report other than the statistics report that is missing or empty is kept out of the snapshot.
+
+    Args:
+        monkeypatch: The Pytest monkeypatch fixture.
+    """
+    with open('tests/example_report.html') as file:
+        statistics = file.read()
+
+    def get(session, url, **kwargs):
+        response = RequestsMock()
+        response.status_code = 404 if url.endswith(PAGES['supplies']) else 200
+        response.text = statistics if url.endswith(PAGES['statistics']) else ''
+        return response
+
+    monkeypatch.setattr(requests.Session, 'get', get)
+
+    with Device('10.0.0.1', pages=('statistics', 'supplies', 'status'), concurrency=3) as device:
+        snapshot = device.get_snapshot()
+
+    assert snapshot['counter'] == '113013'
+    assert snapshot['supplies'] is None
+    assert snapshot['status'] == {}
+
+
+def test_archive_error_does_not_fail_report(tmp_path):
+    """
+    Test that an error of the archive is logged and the report is still read.
+
+    Args:
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    archive = ReportArchive(tmp_path)
+
+    with patch.object(archive, 'store', side_effect=OSError('disk full')):
+        with Device('10.0.0.1', archive=archive) as device:
+            counter = device.get_counter()
+
+    assert counter == '113013'
@@ -0,0 +1,125 @@
+"""
+The collections of the tests for the 'utils.ratelimit.py' module.
+"""
+from threading import Thread
+from time import monotonic, sleep
+
+import pytest
+
+from utils.exceptions import DeadlineExceededError
+from utils.ratelimit import RateLimiter, TokenBucket
+
+
+def test_token_bucket_allows_burst_then_refills_at_rate():
+    """
+    Test that the bucket allows its burst at once and then a token per 1 / rate seconds.
+    """
+    bucket = TokenBucket(rate=2, burst=2, now=0)
+
+    for _ in range(2):
+        assert bucket.wait_time(now=0) == 0
+        bucket.take(now=0)
+
+    assert bucket.wait_time(now=0) == 0.5
+    assert bucket.wait_time(now=0.25) == 0.25
+    assert bucket.wait_time(now=0.5) == 0
+    assert bucket.wait_time(now=100) == 0
+    assert bucket.tokens == 2
+
+
+def test_subnet_of_device():
+    """
+    Test that the devices are grouped by the subnet of the prefix length.
+    """
+    limiter = RateLimiter(prefix=24)
+
+    assert limiter.subnet('192.168.1.17') == '192.168.1.0/24'
+    assert limiter.subnet('192.168.1.200') == limiter.subnet('192.168.1.1')
+    assert limiter.subnet('192.168.2.1') != limiter.subnet('192.168.1.1')
+
+
+def test_device_concurrency_is_capped():
+    """
+    Test that a device never gets more requests in flight than its concurrency cap.
+    """
+    limiter = RateLimiter(device_concurrency=2)
+    active = []
+    peak = []
+
+    def request():
+        with limiter.slot('10.0.0.1'):
+            active.append(1)
+            peak.append(len(active))
+            sleep(0.02)
+            active.pop()
+
+    threads = [Thread(target=request) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 2
+
+
+def test_subnet_concurrency_does_not_block_other_subnets():
+    """
+    Test that a full subnet makes its devices wait while the devices of another subnet are let in.
+    """
+    limiter = RateLimiter(subnet_concurrency=1)
+    limiter.acquire('10.0.0.1')
+
+    with pytest.raises(DeadlineExceededError) as error:
+        limiter.acquire('10.0.0.2', end=monotonic() + 0.05)
+    assert error.type == DeadlineExceededError
+
+    limiter.acquire('10.0.1.1', end=monotonic() + 0.05)
+
+    limiter.release('10.0.0.1')
+    limiter.acquire('10.0.0.2', end=monotonic() + 0.05)
+
+
+def test_device_rate_spaces_requests():
+    """
+    Test that the requests to a device are spaced by its rate once the burst is used.
+    """
+    limiter = RateLimiter(device_rate=20, device_burst=1, device_concurrency=None)
+    times = []
+
+    for _ in range(3):
+        with limiter.slot('10.0.0.1'):
+            times.append(monotonic())
+    with limiter.slot('10.0.0.2'):
+        times.append(monotonic())
+
+    assert times[1] - times[0] >= 0.045
+    assert times[2] - times[1] >= 0.045
+    assert times[3] - times[2] < 0.045
+
+
+def test_slots_count_against_concurrency_and_rate():
+    """
+    Test that a device holding many slots uses them up and pays all its requests to the token bucket.
+    """
+    limiter = RateLimiter(device_rate=10, device_burst=1, device_concurrency=3)
+    assert limiter.max_slots(5) == 3
+    assert limiter.max_slots(2) == 2
+
+    limiter.acquire('10.0.0.1', slots=2, requests=3)
+    with pytest.raises(DeadlineExceededError):
+        limiter.acquire('10.0.0.1', end=monotonic() + 0.05, slots=2)
+    limiter.release('10.0.0.1', slots=2)
+
+    assert limiter._buckets['10.0.0.1'].wait_time() > 0.2
+
+
+def test_try_acquire_does_not_wait():
+    """
+    Test that try_acquire counts the requests in only when they are allowed now and reports why they wait.
+    """
+    limiter = RateLimiter(device_rate=10, device_burst=1, device_concurrency=1)
+
+    assert limiter.try_acquire('10.0.0.1') == 0
+    assert limiter.try_acquire('10.0.0.1') is None
+    limiter.release('10.0.0.1')
+    assert 0 < limiter.try_acquire('10.0.0.1') <= 0.1
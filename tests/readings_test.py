@@ -0,0 +1,141 @@
+"""
+The collections of the tests for the 'utils.readings.py' module.
+"""
+from datetime import datetime
+
+import pytest
+
+from utils import readings
+from utils.readings import ReadingStore
+
+
+@pytest.fixture
+def store(tmp_path) -> ReadingStore:
+    """
+    Fixture for creating a ReadingStore in a temporary directory with a monthly threshold.
+
+    Args:
+        tmp_path: The Pytest temporary directory fixture.
+
+    Returns:
+        ReadingStore: A ReadingStore instance configured for testing.
+    """
+    return ReadingStore(tmp_path / 'readings.json', monthly_threshold=1000)
+
+
+@pytest.mark.parametrize('counter, expected_result', (('113013', 113013), ('113 013', 113013), ('1,234', 1234)))
+def test_counter_value(counter: str, expected_result: int):
+    """
+    Test converting counters read from the device report to integers.
+
+    Args:
+        counter (str): The counter value read from the report.
+        expected_result (int): The expected integer value.
+    """
+    assert readings.counter_value(counter) == expected_result
+
+
+def test_update_reports_only_changes(store: ReadingStore):
+    """
+    Test that a reading is reported when the device is new or its counter changed.
+
+    Args:
+        store (ReadingStore): A ReadingStore instance configured for testing.
+    """
+    first = store.update('10.0.0.1', 'SERIAL', '100', datetime(2022, 10, 1))
+    unchanged = store.update('10.0.0.1', 'SERIAL', '100', datetime(2022, 10, 2))
+    changed = store.update('10.0.0.1', 'SERIAL', '150', datetime(2022, 10, 3))
+
+    assert first['reasons'] == [readings.NEW_DEVICE]
+    assert unchanged is None
+    assert changed['reasons'] == [readings.COUNTER_CHANGED]
+    assert changed['delta'] == 50
+    assert changed['month_pages'] == 50
+
+
+def test_update_reports_threshold_crossing_once_per_month(store: ReadingStore):
+    """
+    Test that crossing the monthly threshold is reported once per month.
+
+    Args:
+        store (ReadingStore): A ReadingStore instance configured for testing.
+    """
+    store.update('10.0.0.1', 'SERIAL', '100', datetime(2022, 10, 1))
+
+    crossed = store.update('10.0.0.1', 'SERIAL', '1100', datetime(2022, 10, 10))
+    above = store.update('10.0.0.1', 'SERIAL', '1200', datetime(2022, 10, 20))
+    next_month = store.update('10.0.0.1', 'SERIAL', '2300', datetime(2022, 11, 20))
+
+    assert readings.THRESHOLD_CROSSED in crossed['reasons']
+    assert readings.THRESHOLD_CROSSED not in above['reasons']
+    assert readings.THRESHOLD_CROSSED in next_month['reasons']
+    assert next_month['month_pages'] == 1100
+
+
+def test_mark_unreachable_reports_once(store: ReadingStore):
+    """
+    Test that a device that stopped responding is reported once and again when it comes back.
+
+    Args:
+        store (ReadingStore): A ReadingStore instance configured for testing.
+    """
+    store.update('10.0.0.1', 'SERIAL', '100')
+
+    down = store.mark_unreachable('10.0.0.1')
+    still_down = store.mark_unreachable('10.0.0.1')
+    never_seen = store.mark_unreachable('10.0.0.2')
+    back = store.update('10.0.0.1', 'SERIAL', '100')
+
+    assert down['serial_number'] == 'SERIAL'
+    assert down['reasons'] == [readings.NOT_RESPONDING]
+    assert still_down is None
+    assert never_seen['serial_number'] is None
+    assert back['reasons'] == [readings.RESPONDING_AGAIN]
+
+
+def test_mark_unreachable_with_unreadable_report(store: ReadingStore):
+    """
+    Test that a device whose report cannot be read is reported with its own reason.
+
+    Args:
+        store (ReadingStore): A ReadingStore instance configured for testing.
+    """
+    store.update('10.0.0.1', 'SERIAL', '100')
+
+    assert store.mark_unreachable('10.0.0.1', readings.UNREADABLE)['reasons'] == [readings.UNREADABLE]
+    assert store.mark_unreachable('10.0.0.2', readings.UNREADABLE)['reasons'] == [readings.UNREADABLE]
+
+
+def test_is_unchanged_compares_stored_report_hash(store: ReadingStore):
+    """
+    Test that a reading is unchanged only if it comes from the report of the stored reading.
+
+    Args:
+        store (ReadingStore): A ReadingStore instance configured for testing.
+    """
+    store.update('10.0.0.1', 'SERIAL', '100', report_hash='first')
+
+    assert store.is_unchanged('10.0.0.1', 'SERIAL', 'first')
+    assert not store.is_unchanged('10.0.0.1', 'SERIAL', 'second')
+    assert not store.is_unchanged('10.0.0.1', 'SERIAL', None)
+    assert not store.is_unchanged('10.0.0.2', 'SERIAL', 'first')
+    store.mark_unreachable('10.0.0.1')
+    assert not store.is_unchanged('10.0.0.1', 'SERIAL', 'first')
+
+
+def test_save_and_load(store: ReadingStore):
+    """
+    Test that the stored readings survive saving and loading the file.
+
+    Args:
+        store (ReadingStore): A ReadingStore instance configured for testing.
+    """
+    store.update('10.0.0.1', 'SERIAL', '100')
+    store.mark_unreachable('10.0.0.2')
+    store.save()
+
+    loaded = ReadingStore(store.path)
+
+    assert loaded.devices == store.devices
+    assert loaded.unreachable == {'10.0.0.2'}
+    assert loaded.update('10.0.0.1', 'SERIAL', '100') is None
@@ -0,0 +1,104 @@
+"""
+The collections of the tests for the 'utils.reparse.py' module.
+"""
+import json
+import shutil
+from unittest.mock import patch
+
+import pytest
+
+from utils import reparse
+
+
+@pytest.fixture
+def reports(tmp_path) -> list:
+    """
+    Fixture for saving copies of the example report and a broken report in a temporary directory.
+
+    Args:
+        tmp_path: The Pytest temporary directory fixture.
+
+    Returns:
+        list: The paths of the saved reports.
+    """
+    for number in range(3):
+        directory = tmp_path / 'reports' / str(number)
+        directory.mkdir(parents=True)
+        shutil.copy('tests/example_report.html', directory / 'devicestatistics.html')
+    (tmp_path / 'reports' / 'broken.html').write_text('<html></html>')
+    (tmp_path / 'reports' / 'notes.txt').write_text('not a report')
+    return reparse.find_reports(tmp_path / 'reports')
+
+
+def test_find_reports(reports: list):
+    """
+    Test that the reports are found in subdirectories and filtered by the pattern.
+
+    Args:
+        reports (list): The paths of the saved reports.
+    """
+    assert len(reports) == 4
+    assert all(path.endswith('.html') for path in reports)
+
+
+def test_parse_file(reports: list):
+    """
+    Test that a report is parsed with the same logic as the Device class and errors are recorded.
+
+    Args:
+        reports (list): The paths of the saved reports.
+    """
+    report, broken = reports[0], reports[-1]
+
+    assert reparse.parse_file(report) == {'path': report, 'serial_number': '701545HH0NLT2', 'counter': '113013'}
+    assert 'error' in reparse.parse_file(broken)
+
+
+@patch('utils.report.fast_cell', return_value='wrong')
+def test_parse_file_verifies_fast_path(mock_fast_cell: patch, reports: list):
+    """
+    Test that the verification rate is applied to the saved reports.
+
+    Args:
+        mock_fast_cell (patch): A mock for the fast_cell function.
+        reports (list): The paths of the saved reports.
+    """
+    assert reparse.parse_file(reports[0])['counter'] == 'wrong'
+    assert reparse.parse_file(reports[0], verify_rate=1.0)['counter'] == '113013'
+
+
+def test_reparse_writes_results_and_reports_progress(reports: list, tmp_path):
+    """
+    Test that every report is written to the output file and the progress is reported.
+
+    Args:
+        reports (list): The paths of the saved reports.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    output = tmp_path / 'results.jsonl'
+    progress = []
+
+    result = reparse.reparse(reports, output, processes=2, progress=lambda done, total: progress.append((done, total)))
+
+    lines = [json.loads(line) for line in output.read_text().splitlines()]
+    assert result == 4
+    assert {line['path'] for line in lines} == set(reports)
+    assert progress[-1] == (4, 4)
+
+
+def test_reparse_resumes_after_interruption(reports: list, tmp_path):
+    """
+    Test that reports already in the output file are skipped and a line cut short is parsed again.
+
+    Args:
+        reports (list): The paths of the saved reports.
+        tmp_path: The Pytest temporary directory fixture.
+    """
+    output = tmp_path / 'results.jsonl'
+    output.write_text(json.dumps(reparse.parse_file(reports[0])) + '\n' + '{"path": "' + reports[1])
+
+    result = reparse.reparse(reports, output, processes=1)
+
+    assert result == 3
+    assert reparse.completed_paths(output) == set(reports)
+    assert reparse.reparse(reports, output, processes=1) == 0
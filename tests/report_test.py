@@ -0,0 +1,166 @@
+"""
+The collections of the tests for the 'utils.report.py' module.
+"""
+from unittest.mock import patch
+
+import pytest
+
+from utils import report
+from utils.exceptions import ReportError
+
+
+@pytest.fixture
+def example_report() -> str:
+    """
+    Fixture for reading the example device statistics report.
+
+    Returns:
+        str: The content of the example report.
+    """
+    with open('tests/example_report.html') as file:
+        return file.read()
+
+
+@pytest.mark.parametrize('table_index, row_index', ((4, -1), (10, 2), (8, 1), (9, 3), (13, -1)))
+def test_fast_cell_matches_soup_cell(example_report: str, table_index: int, row_index: int):
+    """
+    Test that the fast path reads the same cells as the BeautifulSoup path.
+
+    Args:
+        example_report (str): The content of the example report.
+        table_index (int): The index of the table in document order.
+        row_index (int): The index of the row within the table.
+    """
+    expected_result = report.soup_cell(example_report, table_index, row_index)
+
+    assert report.fast_cell(example_report, table_index, row_index) == expected_result
+
+
+@pytest.mark.parametrize(
+    'markup', (
+            '<table><tr><td>no paragraph</td></tr></table>',
+            '<table><tr><td><table><tr><td><p>1</p></td></tr></table></td></tr></table>',
+            '<table><tr><td><p>1</p></td>',
+            '<p>no tables</p>',
+    )
+)
+def test_fast_cell_rejects_unexpected_markup(markup: str):
+    """
+    Test that the fast path gives up on markup it cannot read reliably.
+
+    Args:
+        markup (str): The report markup.
+    """
+    assert report.fast_cell(markup, 0, -1) is None
+
+
+def test_extract_cell_falls_back_to_soup():
+    """
+    Test that a cell the fast path cannot read is extracted with BeautifulSoup.
+    """
+    markup = '<table><tr><td><table><tr><td><p> 42 </p></td></tr></table></td></tr></table>'
+
+    assert report.extract_cell(markup, 0, -1) == '42'
+
+
+@pytest.mark.parametrize('markup', (None, '', '<table><tr><td></td></tr></table>'))
+def test_extract_cell_raises_report_error(markup: str):
+    """
+    Test that a missing report or cell raises a ReportError.
+
+    Args:
+        markup (str): The report markup.
+    """
+    with pytest.raises(ReportError) as error:
+        report.extract_cell(markup, 0, -1)
+
+    assert error.type == ReportError
+
+
+@pytest.mark.parametrize(
+    'markup', (
+        '<!-- <table><tr><td><p>x</p></td></tr></table> -->',
+        '<script>document.write("<table><tr><td><p>x</p></td></tr></table>")</script>',
+        '<STYLE>p { color: red }</STYLE><!---->',
+    ),
+)
+def test_fast_cell_ignores_comments_and_scripts(markup: str):
+    """
+    Test that tables inside comments and scripts are not counted, as in the BeautifulSoup path.
+
+    Args:
+        markup (str): The hidden markup preceding the tables.
+    """
+    html = f'{markup}<table><tr><td><p>a</p></td></tr></table><table><tr><td><p>b</p></td></tr></table>'
+
+    assert report.fast_cell(html, 1, -1) == report.soup_cell(html, 1, -1) == 'b'
+
+
+def test_fast_cell_leaves_unterminated_comment_to_soup():
+    """
+    Test that the fast path gives up on a comment that is never closed.
+    """
+    assert report.fast_cell('<table><tr><td><p>a</p></td></tr></table><!-- <table>', 0, -1) is None
+
+
+@patch('utils.report.fast_cell', return_value='wrong')
+def test_extract_cell_verification_prefers_soup(mock_fast_cell: patch, example_report: str):
+    """
+    Test that the verification mode returns the BeautifulSoup result on a mismatch.
+
+    Args:
+        mock_fast_cell (patch): A mock for the fast_cell function.
+        example_report (str): The content of the example report.
+    """
+    assert report.get_counter(example_report) == 'wrong'
+    assert report.get_counter(example_report, verify_rate=1.0) == '113013'
+
+
+def test_report_memo_flags_unchanged_report():
+    """
+    Test that the memo flags a report identical to the previous one only.
+    """
+    memo = report.ReportMemo()
+    first, second = memo.hash('first'), memo.hash('second')
+
+    assert not memo.update(first)
+    assert memo.update(first)
+    assert not memo.update(second)
+    assert not memo.update(first)
+
+
+def test_report_memo_forgets_least_recently_used_report():
+    """
+    Test that the memo keeps the values of the most recently used reports only.
+    """
+    memo = report.ReportMemo(size=2)
+    memo.set('a', 'counter', '1')
+    memo.set('b', 'counter', '2')
+    assert memo.get('a', 'counter') == '1'
+
+    memo.set('c', 'counter', '3')
+
+    assert memo.get('a', 'counter') == '1'
+    assert memo.get('b', 'counter') is None
+    assert memo.get('c', 'counter') == '3'
+
+
+def test_get_table_values():
+    """
+    Test reading the label/value pairs from the table rows of a report.
+    """
+    content = (
+        '<table><tr><th>Supply</th><th>Level</th></tr>'
+        '<tr><td><p>Black Toner:</p></td><td></td><td><p>80&#37;</p></td></tr>'
+        '<tr><td colspan="3">Footer</td></tr>'
+        '<tr><td>Drum</td><td><b>Low</b></td></tr></table>'
+    )
+
+    assert report.get_table_values(content) == {'Supply': 'Level', 'Black Toner': '80%', 'Drum': 'Low'}
+
+
+def test_get_table_values_of_empty_report():
+    """
+    Test that an empty report has no values.
+    """
+    assert report.get_table_values('') == {}
@@ -0,0 +1,166 @@
+"""
+The collections of the tests for the 'utils.routing.py' module.
+"""
+import pytest
+
+from utils.routing import Router
+
+DEFAULT_SERVER = {'smtp_server': 'smtp.gmail.com', 'port': 587, 'login': 'l', 'password': 'p', 'encryption': 'TLS'}
+
+
+@pytest.fixture
+def router() -> Router:
+    """
+    Fixture for creating a Router with two servers, one of them with the default server settings.
+
+    Returns:
+        Router: A Router instance configured for testing.
+    """
+    return Router(
+        {
+            'servers': {
+                'relay': {**DEFAULT_SERVER, 'smtp_server': 'relay.example.com'},
+                'same': dict(DEFAULT_SERVER),
+            },
+            'groups': {'accounting': ['10.0.0.1', 'SERIAL2']},
+            'routes': [
+                {'groups': ['accounting'], 'receivers': ['accounting@example.com'], 'server': 'relay'},
+                {'devices': ['10.0.0.1'], 'receivers': ['it@example.com']},
+                {'devices': ['10.0.0.3'], 'receivers': ['it@example.com'], 'server': 'same'},
+            ],
+        },
+        'default@example.com',
+        DEFAULT_SERVER,
+    )
+
+
+@pytest.mark.parametrize(
+    'ip_address, serial_number, expected_result', (
+            ('10.0.0.1', None, [('relay', 'accounting@example.com'), ('default', 'it@example.com')]),
+            ('10.0.0.2', 'SERIAL2', [('relay', 'accounting@example.com')]),
+            ('10.0.0.4', 'SERIAL4', [('default', 'default@example.com')]),
+    )
+)
+def test_receivers(router: Router, ip_address: str, serial_number: str, expected_result: list):
+    """
+    Test that printers are matched by IP address, serial number and group, falling back to the default receiver.
+
+    Args:
+        router (Router): A Router instance configured for testing.
+        ip_address (str): The IP address of the printer.
+        serial_number (str): The serial number of the printer.
+        expected_result (list): The expected server names and receivers.
+    """
+    assert router.receivers(ip_address, serial_number) == expected_result
+
+
+def test_route_groups_by_server_settings(router: Router):
+    """
+    Test that servers with identical settings are merged and every receiver gets its own payloads.
+
+    Args:
+        router (Router): A Router instance configured for testing.
+    """
+    result = router.route([
+        ('10.0.0.1', 'SERIAL1', 'first'),
+        ('10.0.0.2', 'SERIAL2', 'second'),
+        ('10.0.0.3', 'SERIAL3', 'third'),
+        ('10.0.0.4', 'SERIAL4', 'fourth'),
+    ])
+
+    assert result == [
+        ({**DEFAULT_SERVER, 'smtp_server': 'relay.example.com'}, {'accounting@example.com': ['first', 'second']}),
+        (DEFAULT_SERVER, {'it@example.com': ['first', 'third'], 'default@example.com': ['fourth']}),
+    ]
+
+
+@pytest.mark.parametrize(
+    'route', (
+            {'devices': ['10.0.0.1'], 'receivers': ['it@example.com'], 'server': 'unknown'},
+            {'groups': ['unknown'], 'receivers': ['it@example.com']},
+    )
+)
+def test_unknown_server_or_group(route: dict):
+    """
+    Test that a route referring to an unknown server or group raises a ValueError.
+
+    Args:
+        route (dict): The invalid route.
+    """
+    with pytest.raises(ValueError) as error:
+        Router({'routes': [route]}, None, DEFAULT_SERVER)
+
+    assert error.type == ValueError
+
+
+def test_server_missing_setting():
+    """
+    Test that a server missing a setting raises a ValueError when the router is created.
+    """
+    server = {key: value for key, value in DEFAULT_SERVER.items() if key != 'encryption'}
+
+    with pytest.raises(ValueError) as error:
+        Router({'servers': {'relay': server}}, None, DEFAULT_SERVER)
+
+    assert error.type == ValueError
+    assert 'encryption' in str(error.value)
+
+
+@pytest.mark.parametrize(
+    'config, default_receiver', (
+            ({}, 'default@example.com'),
+            ({'routes': [{'devices': ['10.0.0.1'], 'receivers': ['it@example.com']}]}, None),
+    )
+)
+def test_default_server_missing_setting(config: dict, default_receiver: str):
+    """
+    Test that the default server is checked when a printer may be sent through it.
+
+    Args:
+        config (dict): The routing configuration.
+        default_receiver (str): The receiver of the printers matched by no route.
+    """
+    server = dict(DEFAULT_SERVER, smtp_server=None)
+
+    with pytest.raises(ValueError) as error:
+        Router(config, default_receiver, server)
+
+    assert error.type == ValueError
+    assert 'smtp_server' in str(error.value)
+
+
+def test_default_server_unused():
+    """
+    Test that the default server may be left unset when every printer is sent through another server.
+    """
+    config = {
+        'servers': {'relay': DEFAULT_SERVER},
+        'routes': [{'devices': ['10.0.0.1'], 'receivers': ['it@example.com'], 'server': 'relay'}],
+    }
+
+    router = Router(config, None, dict.fromkeys(DEFAULT_SERVER))
+
+    assert router.receivers('10.0.0.1') == [('relay', 'it@example.com')]
+
+
+def test_route_without_receivers():
+    """
+    Test that a route without receivers raises a ValueError when the router is created.
+    """
+    with pytest.raises(ValueError) as error:
+        Router({'routes': [{'devices': ['10.0.0.1']}]}, None, DEFAULT_SERVER)
+
+    assert error.type == ValueError
+
+
+def test_unrouted_printer_is_logged(caplog: pytest.LogCaptureFixture):
+    """
+    Test that a printer matched by no route is left out with a warning when there is no default receiver.
+
+    Args:
+        caplog (pytest.LogCaptureFixture): The Pytest log capture fixture.
+    """
+    router = Router({'routes': [{'devices': ['10.0.0.1'], 'receivers': ['it@example.com']}]}, None, DEFAULT_SERVER)
+
+    assert router.route([('10.0.0.2', 'SERIAL2', 'payload')]) == []
+    assert '10.0.0.2' in caplog.text
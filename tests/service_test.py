@@ -0,0 +1,179 @@
+"""
+The collections of the tests for the 'utils.service.py' module.
+"""
+import json
+from threading import Event, Thread
+from time import sleep
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from utils.exceptions import CreateReportError, ReportError
+from utils.service import CounterIndex, create_server
+
+
+class PrinterMock:
+    """
+    A mock of the poller reading printers, counting the requests and the requests in flight.
+
+    Attributes:
+        calls (int): The number of requests made.
+        in_flight (int): The number of requests in flight.
+        max_in_flight (int): The highest number of requests in flight at the same time.
+        release (Event): Lets the requests finish when set.
+    """
+    def __init__(self):
+        """
+        Initialize the necessary attributes.
+        """
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.release = Event()
+        self.release.set()
+
+    def read(self, ip_address: str) -> tuple:
+        """
+        Simulate reading the printer.
+
+        Args:
+            ip_address (str): The IP address of the printer.
+
+        Raises:
+            CreateReportError: For the printer at 10.0.0.9.
+            ReportError: For the printer at 10.0.0.8.
+
+        Returns:
+            tuple: The serial number and the counter of the printer.
+        """
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.release.wait()
+        self.in_flight -= 1
+        if ip_address == '10.0.0.9':
+            raise CreateReportError
+        if ip_address == '10.0.0.8':
+            raise ReportError
+        return f'SERIAL-{ip_address}', str(1000 + self.calls)
+
+
+@pytest.fixture
+def printer() -> PrinterMock:
+    """
+    Fixture for creating a PrinterMock.
+
+    Returns:
+        PrinterMock: A PrinterMock instance.
+    """
+    return PrinterMock()
+
+
+def test_get_uses_cached_reading_while_fresh(printer: PrinterMock):
+    """
+    Test that a fresh reading is served from the index and a stale one is read again.
+
+    Args:
+        printer (PrinterMock): A PrinterMock instance.
+    """
+    index = CounterIndex(['10.0.0.1'], printer.read, max_age=60)
+
+    first = index.get('10.0.0.1')
+    second = index.get('10.0.0.1')
+    refreshed = index.get('10.0.0.1', max_age=0)
+
+    assert first is second
+    assert refreshed['counter'] == '1002'
+    assert printer.calls == 2
+    assert index.find('SERIAL-10.0.0.1') == '10.0.0.1'
+
+
+def test_get_rejects_unknown_printer(printer: PrinterMock):
+    """
+    Test that only the indexed printers can be queried.
+
+    Args:
+        printer (PrinterMock): A PrinterMock instance.
+    """
+    index = CounterIndex(['10.0.0.1'], printer.read)
+
+    with pytest.raises(KeyError):
+        index.get('10.0.0.2')
+
+    assert printer.calls == 0
+
+
+def test_concurrent_requests_are_coalesced(printer: PrinterMock):
+    """
+    Test that concurrent requests for the same printer share a single fetch.
+
+    Args:
+        printer (PrinterMock): A PrinterMock instance.
+    """
+    index = CounterIndex(['10.0.0.1'], printer.read, max_age=0)
+    printer.release.clear()
+    results = []
+    threads = [Thread(target=lambda: results.append(index.get('10.0.0.1'))) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    sleep(0.1)
+    printer.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert printer.calls == 1
+    assert printer.max_in_flight == 1
+    assert len(results) == 10
+    assert all(result is results[0] for result in results)
+
+
+def test_failed_fetch_is_shared_and_retried(printer: PrinterMock):
+    """
+    Test that a failed fetch raises a CreateReportError and the next request tries again.
+
+    Args:
+        printer (PrinterMock): A PrinterMock instance.
+    """
+    index = CounterIndex(['10.0.0.9'], printer.read)
+
+    for _ in range(2):
+        with pytest.raises(CreateReportError):
+            index.get('10.0.0.9')
+
+    assert printer.calls == 2
+
+
+def test_server(printer: PrinterMock):
+    """
+    Test the HTTP endpoints of the service.
+
+    Args:
+        printer (PrinterMock): A PrinterMock instance.
+    """
+    server = create_server(CounterIndex(['10.0.0.1', '10.0.0.8', '10.0.0.9'], printer.read), port=0)
+    Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}'
+
+    def get(path: str):
+        with urlopen(url + path) as response:
+            return json.load(response)
+
+    try:
+        assert get('/devices') == []
+        assert get('/devices/10.0.0.1')['counter'] == '1001'
+        assert get('/serial/SERIAL-10.0.0.1?max_age=0')['counter'] == '1002'
+        assert [reading['ip_address'] for reading in get('/devices')] == ['10.0.0.1']
+        assert [counter for _, counter in get('/history/10.0.0.1')] == [1001, 1002]
+        assert get('/history/10.0.0.8') == []
+        for path, status in (
+                ('/devices/10.0.0.2', 404), ('/serial/unknown', 404), ('/history/10.0.0.2', 404),
+                ('/devices/10.0.0.9', 502),
+                ('/devices/10.0.0.8', 502),
+        ):
+            with pytest.raises(HTTPError) as error:
+                get(path)
+            assert error.value.code == status
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,210 @@
+"""
+This Python module provides a utility class, 'ReportArchive,' for keeping the raw statistics reports
+fetched from the devices, so values can be re-extracted later. Reports are compressed with zlib and
+stored under their SHA-256 hash, so identical pages are stored only once, and every device has
+a time-based index of the reports it served:
+
+    <root>/objects/<first two hash characters>/<rest of the hash>
+    <root>/index/<IP address>.log    one "<timestamp> <hash>" line per stored report
+
+The modification time of a stored report is the time it was last served, so pruning never removes
+a report another process has just indexed.
+"""
+
+from datetime import datetime
+import hashlib
+import os
+from pathlib import Path
+from threading import Lock
+from time import time
+from typing import Iterator, Optional
+import zlib
+
+
+class ReportArchive:
+    """
+    A utility class for storing raw device reports, deduplicated by content hash.
+
+    Attributes:
+        root (Path): The directory of the archive.
+        retention_days (float): The number of days the reports are kept, or None to keep them forever.
+
+    Methods:
+        store(ip_address: str, report: str, now: float = None) -> str:
+            Store the report served by the device and return its hash.
+
+        load(report_hash: str) -> str:
+            Load the report with the given hash.
+
+        history(ip_address: str, start: datetime = None, end: datetime = None) -> Iterator[tuple]:
+            Iterate over the reports served by the device.
+
+        prune(now: float = None) -> int:
+            Remove the reports older than the retention period.
+    """
+    def __init__(self, root: Path, retention_days: Optional[float] = None):
+        """
+        Initialize the ReportArchive object and create its directories.
+
+        Args:
+            root (Path): The directory of the archive.
+            retention_days (Optional[float]): The number of days the reports are kept.
+        """
+        self.root = Path(root)
+        self.retention_days = retention_days
+        self._objects = self.root / 'objects'
+        self._index = self.root / 'index'
+        self._objects.mkdir(parents=True, exist_ok=True)
+        self._index.mkdir(parents=True, exist_ok=True)
+        self._lock = Lock()
+
+    def _object_path(self, report_hash: str) -> Path:
+        """
+        Get the path of the stored report with the given hash.
+
+        Args:
+            report_hash (str): The SHA-256 hash of the report.
+
+        Returns:
+            Path: The path of the compressed report.
+        """
+        return self._objects / report_hash[:2] / report_hash[2:]
+
+    def _index_path(self, ip_address: str) -> Path:
+        """
+        Get the path of the index of the device.
+
+        Args:
+            ip_address (str): The IP address of the device.
+
+        Returns:
+            Path: The path of the index file.
+        """
+        return self._index / f"{ip_address.replace(':', '_')}.log"
+
+    def store(self, ip_address: str, report: str, now: float = None) -> str:
+        """
+        Store the report served by the device. The content is written only if no identical
+        report is stored yet, but its modification time is moved to the timestamp of the report
+        and the index of the device always gets a new entry.
+
+        Args:
+            ip_address (str): The IP address of the device.
+            report (str): The raw device report.
+            now (float): The timestamp of the report, defaults to the current time.
+
+        Returns:
+            str: The SHA-256 hash of the report.
+        """
+        content = report.encode('utf-8')
+        report_hash = hashlib.sha256(content).hexdigest()
+        path = self._object_path(report_hash)
+        now = int(time() if now is None else now)
+
+        with self._lock:
+            try:
+                if path.stat().st_mtime < now:
+                    os.utime(path, (now, now))
+            except FileNotFoundError:
+                path.parent.mkdir(exist_ok=True)
+                temporary_path = path.with_name(path.name + '.tmp')
+                temporary_path.write_bytes(zlib.compress(content, 9))
+                os.utime(temporary_path, (now, now))
+                os.replace(temporary_path, path)
+
+            with open(self._index_path(ip_address), 'a', encoding='utf-8') as file:
+                file.write(f'{now} {report_hash}\n')
+        return report_hash
+
+    def load(self, report_hash: str) -> str:
+        """
+        Load the report with the given hash.
+
+        Args:
+            report_hash (str): The SHA-256 hash of the report.
+
+        Raises:
+            FileNotFoundError: If no report with the given hash is stored.
+
+        Returns:
+            str: The raw device report.
+        """
+        return zlib.decompress(self._object_path(report_hash).read_bytes()).decode('utf-8')
+
+    def _entries(self, path: Path) -> Iterator[tuple]:
+        """
+        Iterate over the entries of an index file.
+
+        Args:
+            path (Path): The path of the index file.
+
+        Yields:
+            tuple: The timestamp and the hash of the next report.
+        """
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                timestamp, report_hash = line.split()
+                yield int(timestamp), report_hash
+
+    def history(self, ip_address: str, start: datetime = None, end: datetime = None) -> Iterator[tuple]:
+        """
+        Iterate over the reports served by the device, oldest first.
+
+        Args:
+            ip_address (str): The IP address of the device.
+            start (datetime): The earliest time of the reports, or None.
+            end (datetime): The time before which the reports were served, or None.
+
+        Yields:
+            tuple: The time and the hash of the next report.
+        """
+        path = self._index_path(ip_address)
+        if not path.exists():
+            return
+        for timestamp, report_hash in self._entries(path):
+            served = datetime.fromtimestamp(timestamp)
+            if (start is None or served >= start) and (end is None or served < end):
+                yield served, report_hash
+
+    def prune(self, now: float = None) -> int:
+        """
+        Remove the index entries older than the retention period and the reports no longer referenced.
+        A report is removed only if it was not served within the retention period either, so a report
+        indexed by another process while pruning is kept.
+
+        Args:
+            now (float): The current timestamp, defaults to the current time.
+
+        Returns:
+            int: The number of removed reports.
+        """
+        if self.retention_days is None:
+            return 0
+        cutoff = (time() if now is None else now) - self.retention_days * 24 * 60 * 60
+
+        referenced = set()
+        with self._lock:
+            for path in self._index.glob('*.log'):
+                entries = [entry for entry in self._entries(path) if entry[0] >= cutoff]
+                referenced.update(report_hash for _, report_hash in entries)
+                if entries:
+                    temporary_path = path.with_name(path.name + '.tmp')
+                    temporary_path.write_text(
+                        ''.join(f'{timestamp} {report_hash}\n' for timestamp, report_hash in entries),
+                        encoding='utf-8',
+                    )
+                    os.replace(temporary_path, path)
+                else:
+                    path.unlink()
+
+            removed = 0
+            for path in self._objects.glob('*/*'):
+                if path.suffix == '.tmp' or path.parent.name + path.name in referenced:
+                    continue
+                try:
+                    if path.stat().st_mtime < cutoff:
+                        path.unlink()
+                        removed += 1
+                except FileNotFoundError:
+                    pass  # removed by another process
+        return removed
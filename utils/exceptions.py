@@ -20,3 +20,15 @@ class CreateReportError(Exception):
     """
     Exception raised when an error occurs while creating a printer report.
     """
+
+
+class DeviceUnavailableError(CreateReportError):
+    """
+    Exception raised when a device is skipped because its circuit breaker is open.
+    """
+
+
+class DeadlineExceededError(CreateReportError):
+    """
+    Exception raised when a device report is not created before the deadline of the poll cycle.
+    """
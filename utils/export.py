@@ -0,0 +1,297 @@
+"""
+This Python module provides writers for exporting counter readings in bulk. Readings are dictionaries
+with the 'time' (datetime), 'ip_address' (str), 'serial_number' (str) and 'counter' (int) keys.
+Naive times are taken as local time. Every format stores the time in UTC and reads it back as an
+aware UTC datetime.
+
+The columnar format stores every field as a fixed-width little-endian array and strings as indexes
+into a dictionary, so downstream tools can 'mmap' the file and scan only the columns they need:
+
+    header:     magic (4s) | version (H) | column count (H) | row count (Q)
+    directory:  per column: name (16s) | typecode (c) | padding (7x) | offset (Q)
+    dictionary: string count (I) | padding (4x) | end offsets (Q * count) | UTF-8 bytes
+    columns:    one 8-byte aligned array per column
+
+JSONL and CSV writers are streaming alternatives that write one reading at a time.
+"""
+
+from array import array
+import csv
+from datetime import datetime, timezone
+import json
+import mmap
+import struct
+import sys
+from typing import Iterable, Iterator, TextIO
+
+MAGIC = b'KMCR'
+VERSION = 1
+
+FIELDS = ('time', 'ip_address', 'serial_number', 'counter')
+COLUMNS = (('time', 'q'), ('counter', 'q'), ('serial_number', 'I'), ('ip_address', 'I'))
+STRING_COLUMNS = ('serial_number', 'ip_address')
+
+_HEADER = struct.Struct('<4sHHQ')
+_DIRECTORY_ENTRY = struct.Struct('<16sc7xQ')
+_DICTIONARY_HEADER = struct.Struct('<I4x')
+
+
+def _align(offset: int) -> int:
+    """
+    Round the offset up to a multiple of 8 bytes.
+
+    Args:
+        offset (int): The offset in bytes.
+
+    Returns:
+        int: The aligned offset.
+    """
+    return (offset + 7) & ~7
+
+
+def _little_endian(values: array) -> bytes:
+    """
+    Get the bytes of the array in little-endian order.
+
+    Args:
+        values (array): The array to convert.
+
+    Returns:
+        bytes: The little-endian bytes of the array.
+    """
+    if sys.byteorder != 'little':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def write_columnar(readings: Iterable[dict], path: str) -> int:
+    """
+    Write the readings to a columnar binary file.
+
+    Args:
+        readings (Iterable[dict]): The readings to write.
+        path (str): The path to the output file.
+
+    Returns:
+        int: The number of written readings.
+    """
+    columns = {name: array(typecode) for name, typecode in COLUMNS}
+    strings = {}
+    for reading in readings:
+        columns['time'].append(int(reading['time'].timestamp()))
+        columns['counter'].append(int(reading['counter']))
+        for name in STRING_COLUMNS:
+            columns[name].append(strings.setdefault(reading[name], len(strings)))
+
+    encoded = [string.encode('utf-8') for string in strings]
+    ends = array('Q')
+    end = 0
+    for value in encoded:
+        end += len(value)
+        ends.append(end)
+
+    offset = _HEADER.size + _DIRECTORY_ENTRY.size * len(COLUMNS)
+    offset += _DICTIONARY_HEADER.size + ends.itemsize * len(ends) + end
+    offsets = {}
+    for name, _ in COLUMNS:
+        offset = _align(offset)
+        offsets[name] = offset
+        offset += columns[name].itemsize * len(columns[name])
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, len(COLUMNS), len(columns['time'])))
+        for name, typecode in COLUMNS:
+            file.write(_DIRECTORY_ENTRY.pack(name.encode('ascii'), typecode.encode('ascii'), offsets[name]))
+        file.write(_DICTIONARY_HEADER.pack(len(encoded)))
+        file.write(_little_endian(ends))
+        file.write(b''.join(encoded))
+        for name, _ in COLUMNS:
+            file.write(b'\0' * (offsets[name] - file.tell()))
+            file.write(_little_endian(columns[name]))
+
+    return len(columns['time'])
+
+
+class ColumnarReader:
+    """
+    A utility class for reading a columnar binary file through a memory map without parsing it.
+
+    Attributes:
+        path (str): The path to the columnar file.
+        strings (list): The string dictionary shared by the string columns.
+
+    Methods:
+        column(name: str):
+            Get the raw values of a column, as a zero-copy memoryview where possible.
+
+        string_column(name: str) -> list:
+            Get the decoded values of a string column.
+
+        readings() -> Iterator[dict]:
+            Iterate over the readings as dictionaries.
+    """
+    def __init__(self, path: str):
+        """
+        Initialize the ColumnarReader object and map the file into memory.
+
+        Args:
+            path (str): The path to the columnar file.
+
+        Raises:
+            ValueError: If the file is not a columnar readings file.
+        """
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, column_count, self._rows = _HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f'{path} is not a columnar readings file')
+
+        self._columns = {}
+        offset = _HEADER.size
+        for _ in range(column_count):
+            name, typecode, column_offset = _DIRECTORY_ENTRY.unpack_from(self._mmap, offset)
+            self._columns[name.rstrip(b'\0').decode('ascii')] = (typecode.decode('ascii'), column_offset)
+            offset += _DIRECTORY_ENTRY.size
+
+        count, = _DICTIONARY_HEADER.unpack_from(self._mmap, offset)
+        offset += _DICTIONARY_HEADER.size
+        ends = struct.unpack_from(f'<{count}Q', self._mmap, offset)
+        offset += 8 * count
+        self.strings = []
+        start = 0
+        for end in ends:
+            self.strings.append(self._mmap[offset + start:offset + end].decode('utf-8'))
+            start = end
+
+    def __enter__(self):
+        """Implemented to use ColumnarReader class as a context manager"""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Close the memory map when leaving the context manager"""
+        self.close()
+
+    def __len__(self) -> int:
+        """
+        Get the number of readings in the file.
+
+        Returns:
+            int: The number of readings.
+        """
+        return self._rows
+
+    def close(self):
+        """
+        Close the memory map.
+        """
+        self._mmap.close()
+
+    def column(self, name: str):
+        """
+        Get the raw values of a column. String columns hold indexes into 'strings'.
+
+        Args:
+            name (str): The name of the column.
+
+        Raises:
+            KeyError: If the file has no such column.
+
+        Returns:
+            memoryview | array: A zero-copy memoryview on little-endian machines, otherwise an array copy.
+                A memoryview must be released before the reader is closed.
+        """
+        typecode, offset = self._columns[name]
+        size = array(typecode).itemsize * self._rows
+        values = memoryview(self._mmap)[offset:offset + size].cast(typecode)
+        if sys.byteorder == 'little':
+            return values
+        values = array(typecode, values)
+        values.byteswap()
+        return values
+
+    def string_column(self, name: str) -> list:
+        """
+        Get the decoded values of a string column.
+
+        Args:
+            name (str): The name of the column.
+
+        Returns:
+            list: The strings of the column.
+        """
+        return [self.strings[index] for index in self.column(name)]
+
+    def readings(self) -> Iterator[dict]:
+        """
+        Iterate over the readings as dictionaries.
+
+        Yields:
+            dict: The next reading.
+        """
+        times = self.column('time')
+        counters = self.column('counter')
+        serial_numbers = self.column('serial_number')
+        ip_addresses = self.column('ip_address')
+        for row in range(self._rows):
+            yield {
+                'time': datetime.fromtimestamp(times[row], timezone.utc),
+                'ip_address': self.strings[ip_addresses[row]],
+                'serial_number': self.strings[serial_numbers[row]],
+                'counter': counters[row],
+            }
+
+
+def _serializable(reading: dict) -> dict:
+    """
+    Convert the reading to a dictionary of JSON and CSV friendly values.
+
+    Args:
+        reading (dict): The reading to convert.
+
+    Returns:
+        dict: The reading with the time in ISO 8601 format in UTC.
+    """
+    return {
+        field: reading[field].astimezone(timezone.utc).isoformat() if field == 'time' else reading[field]
+        for field in FIELDS
+    }
+
+
+def write_jsonl(readings: Iterable[dict], file: TextIO) -> int:
+    """
+    Write the readings to a file as JSON Lines, one reading at a time.
+
+    Args:
+        readings (Iterable[dict]): The readings to write.
+        file (TextIO): The output file.
+
+    Returns:
+        int: The number of written readings.
+    """
+    count = 0
+    for count, reading in enumerate(readings, 1):
+        file.write(json.dumps(_serializable(reading)) + '\n')
+    return count
+
+
+def write_csv(readings: Iterable[dict], file: TextIO) -> int:
+    """
+    Write the readings to a file as CSV with a header row, one reading at a time.
+
+    Args:
+        readings (Iterable[dict]): The readings to write.
+        file (TextIO): The output file, opened with newline=''.
+
+    Returns:
+        int: The number of written readings.
+    """
+    writer = csv.DictWriter(file, fieldnames=FIELDS)
+    writer.writeheader()
+    count = 0
+    for count, reading in enumerate(readings, 1):
+        writer.writerow(_serializable(reading))
+    return count
@@ -0,0 +1,248 @@
+"""
+This Python module provides utility classes for tracking the health of networked devices. Every device
+has a circuit breaker: after repeated failures the circuit opens and the device is skipped until
+the next probe, with the delay between probes growing exponentially while the device stays down.
+"""
+
+import json
+import os
+from pathlib import Path
+from time import time
+from typing import Optional
+
+LATENCY_HISTORY = 50
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class DeviceHealth:
+    """
+    A utility class implementing a circuit breaker for a single device.
+
+    Attributes:
+        failure_threshold (int): The number of consecutive failures that opens the circuit.
+        base_delay (float): The delay in seconds before the first probe of an open circuit.
+        max_delay (float): The maximum delay in seconds between probes.
+        state (str): The state of the circuit ('closed', 'open' or 'half-open').
+        failures (int): The number of consecutive failures.
+        opened (int): The number of times the circuit opened since the last success.
+        last_seen (float): The timestamp of the last successful request, or None.
+        next_probe (float): The timestamp after which an open circuit lets a probe through.
+        latencies (list): The durations in seconds of the most recent successful requests.
+
+    Methods:
+        allow(now: float = None) -> bool:
+            Check if a request to the device should be made.
+
+        record_success(now: float = None):
+            Record a successful request and close the circuit.
+
+        record_failure(now: float = None):
+            Record a failed request and open the circuit if needed.
+
+        record_latency(seconds: float):
+            Record the duration of a successful request.
+
+        latency_percentile(percentile: float) -> Optional[float]:
+            Get a percentile of the recorded request durations.
+
+        timeout(factor: float, default: float, minimum: float, maximum: float) -> float:
+            Get a request timeout adapted to the recorded request durations.
+    """
+    def __init__(self, failure_threshold: int = 3, base_delay: float = 60 * 60, max_delay: float = 24 * 60 * 60):
+        """
+        Initialize the DeviceHealth object with a closed circuit.
+
+        Args:
+            failure_threshold (int): The number of consecutive failures that opens the circuit.
+            base_delay (float): The delay in seconds before the first probe of an open circuit.
+            max_delay (float): The maximum delay in seconds between probes.
+        """
+        self.failure_threshold = failure_threshold
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.last_seen = None
+        self.next_probe = 0.0
+        self.latencies = []
+
+    def allow(self, now: float = None) -> bool:
+        """
+        Check if a request to the device should be made. An open circuit turns half-open once
+        the probe time has come, letting a single probe through.
+
+        Args:
+            now (float): The current timestamp, defaults to the current time.
+
+        Returns:
+            bool: True if the request should be made, False if the device should be skipped.
+        """
+        if self.state == OPEN:
+            if (time() if now is None else now) < self.next_probe:
+                return False
+            self.state = HALF_OPEN
+        return True
+
+    def record_success(self, now: float = None):
+        """
+        Record a successful request and close the circuit.
+
+        Args:
+            now (float): The current timestamp, defaults to the current time.
+        """
+        self.state = CLOSED
+        self.failures = 0
+        self.opened = 0
+        self.last_seen = time() if now is None else now
+
+    def record_failure(self, now: float = None):
+        """
+        Record a failed request. The circuit opens when the failure threshold is reached or
+        when a half-open probe fails, and every reopening doubles the delay until the next probe.
+
+        Args:
+            now (float): The current timestamp, defaults to the current time.
+        """
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            delay = min(self.base_delay * 2 ** self.opened, self.max_delay)
+            self.state = OPEN
+            self.opened += 1
+            self.next_probe = (time() if now is None else now) + delay
+
+    def record_latency(self, seconds: float):
+        """
+        Record the duration of a successful request, keeping only the most recent ones.
+
+        Args:
+            seconds (float): The duration of the request in seconds.
+        """
+        self.latencies.append(seconds)
+        del self.latencies[:-LATENCY_HISTORY]
+
+    def latency_percentile(self, percentile: float, min_samples: int = 5) -> Optional[float]:
+        """
+        Get a percentile of the recorded request durations.
+
+        Args:
+            percentile (float): The percentile, between 0 and 100.
+            min_samples (int): The number of recorded durations needed for a meaningful result.
+
+        Returns:
+            Optional[float]: The percentile in seconds, or None if too few durations were recorded.
+        """
+        if len(self.latencies) < min_samples:
+            return None
+        latencies = sorted(self.latencies)
+        return latencies[min(int(len(latencies) * percentile / 100), len(latencies) - 1)]
+
+    def timeout(self, factor: float = 3.0, default: float = 10.0, minimum: float = 1.0, maximum: float = 30.0) -> float:
+        """
+        Get a request timeout adapted to the device: the 95th percentile of its request durations
+        multiplied by the factor, kept between the minimum and the maximum.
+
+        Args:
+            factor (float): The multiplier of the 95th percentile.
+            default (float): The timeout in seconds used until enough durations are recorded.
+            minimum (float): The minimum timeout in seconds.
+            maximum (float): The maximum timeout in seconds.
+
+        Returns:
+            float: The timeout in seconds.
+        """
+        p95 = self.latency_percentile(95)
+        if p95 is None:
+            return default
+        return min(max(p95 * factor, minimum), maximum)
+
+    def to_dict(self) -> dict:
+        """
+        Get the state of the circuit as a dictionary.
+
+        Returns:
+            dict: The state of the circuit.
+        """
+        return {
+            'state': self.state,
+            'failures': self.failures,
+            'opened': self.opened,
+            'last_seen': self.last_seen,
+            'next_probe': self.next_probe,
+            'latencies': self.latencies,
+        }
+
+    def load(self, state: dict):
+        """
+        Restore the state of the circuit from a dictionary created by 'to_dict'.
+
+        Args:
+            state (dict): The state of the circuit.
+        """
+        self.state = state['state']
+        self.failures = state['failures']
+        self.opened = state['opened']
+        self.last_seen = state['last_seen']
+        self.next_probe = state['next_probe']
+        self.latencies = state.get('latencies', [])
+
+
+class HealthTracker:
+    """
+    A utility class for keeping the circuit breakers of many devices, optionally persisted in a JSON file.
+
+    Attributes:
+        path (Path): The path to the JSON file with the device health, or None to keep it in memory.
+        devices (dict): The circuit breakers, keyed by IP address.
+
+    Methods:
+        get(ip_address: str) -> DeviceHealth:
+            Get the circuit breaker of the device, creating a closed one for new devices.
+
+        save():
+            Write the device health to the JSON file.
+    """
+    def __init__(self, path: Optional[Path] = None, **options):
+        """
+        Initialize the HealthTracker object and load the device health, if the file exists.
+
+        Args:
+            path (Optional[Path]): The path to the JSON file with the device health.
+            **options: The options passed to every 'DeviceHealth'.
+        """
+        self.path = Path(path) if path else None
+        self.devices = {}
+        self._options = options
+
+        if self.path and self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as file:
+                for ip_address, state in json.load(file).items():
+                    self.get(ip_address).load(state)
+
+    def get(self, ip_address: str) -> DeviceHealth:
+        """
+        Get the circuit breaker of the device, creating a closed one for new devices.
+
+        Args:
+            ip_address (str): The IP address of the device.
+
+        Returns:
+            DeviceHealth: The circuit breaker of the device.
+        """
+        if ip_address not in self.devices:
+            self.devices[ip_address] = DeviceHealth(**self._options)
+        return self.devices[ip_address]
+
+    def save(self):
+        """
+        Write the device health to the JSON file, replacing it atomically. Does nothing without a file.
+        """
+        if not self.path:
+            return
+        temporary_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump({ip_address: health.to_dict() for ip_address, health in self.devices.items()}, file, indent=2)
+        os.replace(temporary_path, self.path)
@@ -0,0 +1,230 @@
+"""
+This Python module provides compact in-memory ring buffers of the recent readings of every device.
+Timestamps and counters are kept in preallocated 'array' buffers, 4 and 8 bytes per reading, so
+thousands of devices with a thousand readings each fit in a small amount of memory. Appending a reading
+is O(1) and overwrites the oldest one once the buffer is full.
+"""
+
+from array import array
+import sys
+from typing import Iterator, Optional
+
+
+class Reading:
+    """
+    A single reading of a device, created on access from the ring buffer.
+
+    Attributes:
+        time (int): The timestamp of the reading in seconds.
+        counter (int): The counter value.
+    """
+    __slots__ = ('time', 'counter')
+
+    def __init__(self, time: int, counter: int):
+        """
+        Initialize the Reading object.
+
+        Args:
+            time (int): The timestamp of the reading in seconds.
+            counter (int): The counter value.
+        """
+        self.time = time
+        self.counter = counter
+
+    def __eq__(self, other) -> bool:
+        """Compare the readings by value"""
+        return isinstance(other, Reading) and (self.time, self.counter) == (other.time, other.counter)
+
+    def __repr__(self) -> str:
+        """Represent the reading with its values"""
+        return f'Reading(time={self.time}, counter={self.counter})'
+
+
+class ReadingRing:
+    """
+    A fixed-capacity ring buffer of the readings of a single device.
+
+    Attributes:
+        capacity (int): The maximum number of readings kept.
+
+    Methods:
+        append(time: int, counter: int):
+            Append a reading, overwriting the oldest one if the buffer is full.
+
+        latest() -> Optional[Reading]:
+            Get the most recent reading.
+
+        nbytes() -> int:
+            Get the memory used by the buffer.
+    """
+    __slots__ = ('capacity', '_times', '_counters', '_start', '_size')
+
+    def __init__(self, capacity: int):
+        """
+        Initialize the ReadingRing object with preallocated buffers.
+
+        Args:
+            capacity (int): The maximum number of readings kept.
+        """
+        self.capacity = capacity
+        self._times = array('I', bytes(4 * capacity))
+        self._counters = array('Q', bytes(8 * capacity))
+        self._start = 0
+        self._size = 0
+
+    def __len__(self) -> int:
+        """
+        Get the number of readings in the buffer.
+
+        Returns:
+            int: The number of readings.
+        """
+        return self._size
+
+    def __getitem__(self, index: int) -> Reading:
+        """
+        Get a reading by its position, the oldest first. Negative positions count from the most recent.
+
+        Args:
+            index (int): The position of the reading.
+
+        Raises:
+            IndexError: If there is no reading at the position.
+
+        Returns:
+            Reading: The reading.
+        """
+        if index < 0:
+            index += self._size
+        if not 0 <= index < self._size:
+            raise IndexError('reading index out of range')
+        position = (self._start + index) % self.capacity
+        return Reading(self._times[position], self._counters[position])
+
+    def __iter__(self) -> Iterator[Reading]:
+        """
+        Iterate over the readings, the oldest first.
+
+        Yields:
+            Reading: The next reading.
+        """
+        for index in range(self._size):
+            yield self[index]
+
+    def append(self, time: int, counter: int):
+        """
+        Append a reading, overwriting the oldest one if the buffer is full.
+
+        Args:
+            time (int): The timestamp of the reading in seconds.
+            counter (int): The counter value.
+        """
+        position = (self._start + self._size) % self.capacity
+        self._times[position] = int(time)
+        self._counters[position] = int(counter)
+        if self._size < self.capacity:
+            self._size += 1
+        else:
+            self._start = (self._start + 1) % self.capacity
+
+    def latest(self) -> Optional[Reading]:
+        """
+        Get the most recent reading.
+
+        Returns:
+            Optional[Reading]: The most recent reading, or None if the buffer is empty.
+        """
+        return self[-1] if self._size else None
+
+    def nbytes(self) -> int:
+        """
+        Get the memory used by the buffer, including the buffer objects.
+
+        Returns:
+            int: The memory in bytes.
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self._times) + sys.getsizeof(self._counters)
+
+
+class ReadingHistory:
+    """
+    A utility class keeping a ring buffer of the recent readings of every device.
+
+    Attributes:
+        capacity (int): The maximum number of readings kept per device.
+
+    Methods:
+        append(key: str, time: int, counter: int):
+            Append a reading of the device.
+
+        get(key: str) -> Optional[ReadingRing]:
+            Get the readings of the device.
+
+        nbytes() -> int:
+            Get the memory used by all the buffers.
+    """
+    def __init__(self, capacity: int = 1000):
+        """
+        Initialize the ReadingHistory object.
+
+        Args:
+            capacity (int): The maximum number of readings kept per device.
+        """
+        self.capacity = capacity
+        self._rings = {}
+
+    def __len__(self) -> int:
+        """
+        Get the number of devices with readings.
+
+        Returns:
+            int: The number of devices.
+        """
+        return len(self._rings)
+
+    def __contains__(self, key: str) -> bool:
+        """
+        Check if the device has readings.
+
+        Args:
+            key (str): The IP address or the serial number of the device.
+
+        Returns:
+            bool: True if the device has readings, False otherwise.
+        """
+        return key in self._rings
+
+    def append(self, key: str, time: int, counter: int):
+        """
+        Append a reading of the device, creating its ring buffer on the first reading.
+
+        Args:
+            key (str): The IP address or the serial number of the device.
+            time (int): The timestamp of the reading in seconds.
+            counter (int): The counter value.
+        """
+        ring = self._rings.get(key)
+        if ring is None:
+            ring = self._rings[key] = ReadingRing(self.capacity)
+        ring.append(time, counter)
+
+    def get(self, key: str) -> Optional[ReadingRing]:
+        """
+        Get the readings of the device.
+
+        Args:
+            key (str): The IP address or the serial number of the device.
+
+        Returns:
+            Optional[ReadingRing]: The ring buffer of the device, or None if it has no readings.
+        """
+        return self._rings.get(key)
+
+    def nbytes(self) -> int:
+        """
+        Get the memory used by all the buffers, including the index of the devices.
+
+        Returns:
+            int: The memory in bytes.
+        """
+        return sys.getsizeof(self._rings) + sum(ring.nbytes() for ring in self._rings.values())
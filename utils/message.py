@@ -25,6 +25,9 @@ class Email:
 
         send(title: str, message: str):
             Send an email with the given title and message content to the specified recipient.
+
+        send_many(messages: list):
+            Send many emails to their recipients over a single SMTP connection.
     """
     def __init__(self, smtp_server: str, login: str, password: str, port: int, receiver: str, encryption: str):
         """
@@ -45,13 +48,14 @@ class Email:
         self.receiver = receiver
         self.encryption = encryption
 
-    def _create_message(self, message_title: str, message_body: str) -> EmailMessage:
+    def _create_message(self, message_title: str, message_body: str, receiver: str = None) -> EmailMessage:
         """
         Create an EmailMessage object with the specified title, body, and sender/receiver information.
 
         Args:
             message_title (str): The title or subject of the email.
             message_body (str): The body or content of the email.
+            receiver (str): The recipient email address, defaults to 'receiver'.
 
         Returns:
             EmailMessage: An EmailMessage object representing the email to be sent.
@@ -59,7 +63,7 @@ class Email:
         message = EmailMessage()
         message['Subject'] = message_title
         message['From'] = self.login
-        message['To'] = self.receiver
+        message['To'] = receiver or self.receiver
         message.set_content(message_body)
         return message
 
@@ -71,13 +75,21 @@ class Email:
             title (str): The title or subject of the email.
             message (str): The body or content of the email.
         """
-        if self.encryption.upper() == 'SSL':
-            with smtplib.SMTP_SSL(self.smtp_server, self.port) as server:
-                server.login(self.login, self.password)
-                server.send_message(self._create_message(title, message))
-        else:
-            with smtplib.SMTP(self.smtp_server, self.port) as server:
-                if self.encryption.upper() == 'TLS':
-                    server.starttls()
-                server.login(self.login, self.password)
-                server.send_message(self._create_message(title, message))
+        self.send_many([(self.receiver, title, message)])
+
+    def send_many(self, messages: list):
+        """
+        Send many emails over a single SMTP connection.
+
+        Args:
+            messages (list): The (receiver, title, message) tuple of every email.
+        """
+        if not messages:
+            return
+        smtp = smtplib.SMTP_SSL if self.encryption.upper() == 'SSL' else smtplib.SMTP
+        with smtp(self.smtp_server, self.port) as server:
+            if self.encryption.upper() == 'TLS':
+                server.starttls()
+            server.login(self.login, self.password)
+            for receiver, title, message in messages:
+                server.send_message(self._create_message(title, message, receiver))
@@ -0,0 +1,367 @@
+"""
+This Python module provides a utility class, 'Poller,' for reading statistics from a fleet of networked
+printers. It keeps a circuit breaker per device, so printers known to be down are skipped almost for free
+and never delay the healthy ones.
+
+Poll cycles read the printers concurrently within an overall deadline. Every request gets a timeout adapted
+to the latency history of its printer, slow printers can be hedged with a second request, and printers still
+pending at the deadline are marked as missed, so a cycle finishes on time whatever the fleet size. An optional
+rate limiter caps the requests per printer and per subnet, so no web server or branch link gets more than it
+can handle. A printer is handed to a worker only once the limiter lets its request in, so a busy subnet never
+holds up the workers while the printers of other subnets wait.
+"""
+
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import nullcontext
+import json
+import os
+from pathlib import Path
+from time import monotonic, sleep
+from typing import Iterable, Optional
+
+from .archive import ReportArchive
+from .exceptions import (
+    CreateReportError, DeadlineExceededError, DeviceUnavailableError, InvalidAddressError, ReportError,
+)
+from .health import HealthTracker
+from .printer import Device, check_pages
+from .ratelimit import RateLimiter
+from .report import ReportMemo
+
+IDLE_WAIT = 0.05
+
+
+class PollResult(tuple):
+    """
+    The serial number and the counter of a printer, unpacked like a tuple, flagged when the report of
+    the printer did not change since the previous read.
+
+    Attributes:
+        unchanged (bool): True if the report is identical to the previous one, so nothing changed.
+        report_hash (str): The hash of the statistics report, or None if it is not known.
+    """
+    def __new__(cls, serial_number: str, counter: str, unchanged: bool = False, report_hash: Optional[str] = None):
+        """
+        Create the PollResult object.
+
+        Args:
+            serial_number (str): The serial number of the printer.
+            counter (str): The counter value of the printer.
+            unchanged (bool): True if the report is identical to the previous one.
+            report_hash (Optional[str]): The hash of the statistics report.
+
+        Returns:
+            PollResult: The result.
+        """
+        result = super().__new__(cls, (serial_number, counter))
+        result.unchanged = unchanged
+        result.report_hash = report_hash
+        return result
+
+
+class Poller:
+    """
+    A utility class for reading statistics from networked printers with per-device health tracking.
+
+    Attributes:
+        health (HealthTracker): The circuit breakers and latency histories of the devices.
+        max_workers (int): The number of printers read at the same time.
+        timeout_factor (float): The multiplier of the 95th latency percentile giving the request timeout.
+        archive (ReportArchive): The archive keeping every fetched report, or None.
+        limiter (RateLimiter): The rate and concurrency limits per printer and per subnet, or None.
+        pages (tuple): The names of the reports fetched from every printer.
+        verify_rate (float): The fraction of reads cross-checked against the full BeautifulSoup parse.
+        memo_path (Path): The path to the JSON file with the last report hash of every printer, or None.
+        snapshots (dict): The last snapshot of the reports of every printer, keyed by IP address.
+
+    Methods:
+        read(ip_address: str) -> PollResult:
+            Read the serial number and the counter from the printer.
+
+        poll(ip_addresses: Iterable[str], deadline: float = None, hedge: bool = False) -> dict:
+            Read many printers concurrently within the deadline.
+
+        save():
+            Write the health of the printers and their last report hashes to their JSON files.
+    """
+    def __init__(
+            self, health: Optional[HealthTracker] = None, max_workers: int = 8, timeout_factor: float = 3.0,
+            archive: Optional[ReportArchive] = None, limiter: Optional[RateLimiter] = None,
+            pages: Iterable[str] = ('statistics',), memo_path: Optional[Path] = None, verify_rate: float = 0.0,
+    ):
+        """
+        Initialize the Poller object.
+
+        Args:
+            health (Optional[HealthTracker]): The circuit breakers of the devices, kept in memory by default.
+            max_workers (int): The number of printers read at the same time.
+            timeout_factor (float): The multiplier of the 95th latency percentile giving the request timeout.
+            archive (Optional[ReportArchive]): The archive keeping every fetched report.
+            limiter (Optional[RateLimiter]): The rate and concurrency limits per printer and per subnet.
+            pages (Iterable[str]): The names of the reports fetched from every printer, keys of 'PAGES'.
+                The statistics report is always fetched, only its failures count towards the health.
+            memo_path (Optional[Path]): The path to the JSON file with the last report hash and values
+                of every printer, so unchanged reports are recognized between runs.
+            verify_rate (float): The fraction of reads, between 0 and 1, in which the regex fast path
+                is cross-checked against the full BeautifulSoup parse.
+
+        Raises:
+            ValueError: If a report name is unknown.
+        """
+        self.health = health or HealthTracker()
+        self.max_workers = max_workers
+        self.timeout_factor = timeout_factor
+        self.archive = archive
+        self.limiter = limiter
+        self.pages = tuple(dict.fromkeys(('statistics', *pages)))
+        check_pages(self.pages)
+        self.verify_rate = verify_rate
+        self.snapshots = {}
+        self.memo_path = Path(memo_path) if memo_path else None
+        self._memos = {}
+
+        if self.memo_path and self.memo_path.exists():
+            with open(self.memo_path, 'r', encoding='utf-8') as file:
+                for ip_address, state in json.load(file).items():
+                    self._memos.setdefault(ip_address, ReportMemo()).load(state)
+
+    def _slots(self) -> int:
+        """
+        Get the number of reports of a printer fetched at the same time.
+
+        Returns:
+            int: The number of reports, bounded by the concurrency caps of the rate limiter.
+        """
+        return self.limiter.max_slots(len(self.pages)) if self.limiter else len(self.pages)
+
+    def _attempt(
+            self, ip_address: str, end: Optional[float] = None, started: Optional[dict] = None,
+            acquired: bool = False,
+    ) -> PollResult:
+        """
+        Fetch the reports of the printer with a timeout adapted to its latency history, once the rate
+        limiter allows it. The reports are fetched concurrently up to the slots the limiter grants.
+
+        Args:
+            ip_address (str): The IP address of the printer.
+            end (Optional[float]): The monotonic time of the cycle deadline, or None.
+            started (Optional[dict]): The monotonic start time of the first request, keyed by IP address.
+            acquired (bool): Whether the caller holds the slots of the printer from the limiter and releases them.
+
+        Raises:
+            DeadlineExceededError: If the deadline passed before the request was allowed to start.
+            CreateReportError: If the device report cannot be created.
+            ReportError: If the values cannot be found in the device report.
+            InvalidAddressError: If the IP address is invalid.
+
+        Returns:
+            PollResult: The serial number and the counter of the printer, flagged if the report did not change.
+        """
+        health = self.health.get(ip_address)
+        memo = self._memos.setdefault(ip_address, ReportMemo())
+        slots = self._slots()
+        limit = self.limiter.slot(ip_address, end, slots, len(self.pages)) if self.limiter and not acquired else None
+        with limit or nullcontext():
+            timeout = health.timeout(self.timeout_factor)
+            start = monotonic()
+            if end is not None:
+                if start >= end:
+                    raise DeadlineExceededError
+                timeout = min(timeout, end - start)
+            if started is not None:
+                started.setdefault(ip_address, start)
+
+            try:
+                with Device(
+                        ip_address, verify_rate=self.verify_rate, timeout=timeout, archive=self.archive,
+                        memo=memo, pages=self.pages, concurrency=slots,
+                ) as device:
+                    result = PollResult(
+                        device.get_serial_number(), device.get_counter(), device.unchanged, device.report_hash,
+                    )
+                    snapshot = device.get_snapshot()
+            except (CreateReportError, ReportError, InvalidAddressError):
+                health.record_failure()
+                self.snapshots.pop(ip_address, None)
+                raise
+
+        self.snapshots[ip_address] = snapshot
+
+        health.record_success()
+        health.record_latency(monotonic() - start)
+        return result
+
+    def read(self, ip_address: str) -> PollResult:
+        """
+        Read the serial number and the counter from the printer, unless its circuit breaker is open.
+
+        Args:
+            ip_address (str): The IP address of the printer.
+
+        Raises:
+            DeviceUnavailableError: If the printer is skipped because its circuit breaker is open.
+            CreateReportError: If the device report cannot be created.
+            ReportError: If the values cannot be found in the device report.
+            InvalidAddressError: If the IP address is invalid.
+
+        Returns:
+            PollResult: The serial number and the counter of the printer, flagged if the report did not change.
+        """
+        if not self.health.get(ip_address).allow():
+            raise DeviceUnavailableError
+        return self._attempt(ip_address)
+
+    def _hedge_time(self, ip_address: str, started: dict) -> Optional[float]:
+        """
+        Get the monotonic time at which a second request to a slow printer should be made.
+
+        Args:
+            ip_address (str): The IP address of the printer.
+            started (dict): The monotonic start time of the first request, keyed by IP address.
+
+        Returns:
+            Optional[float]: The time of the hedged request, or None if it is not known yet.
+        """
+        p95 = self.health.get(ip_address).latency_percentile(95)
+        if p95 is None or ip_address not in started:
+            return None
+        return started[ip_address] + p95
+
+    def poll(self, ip_addresses: Iterable[str], deadline: float = None, hedge: bool = False) -> dict:
+        """
+        Read the serial number and the counter from many printers concurrently.
+
+        Printers with an open circuit breaker are skipped. A printer is handed to a worker once the
+        rate limiter lets its request in, the others keep their turn in the queue. With hedging, a printer
+        slower than the 95th percentile of its latency history gets a second request and the first answer
+        wins. Printers limited to a single request in flight are never hedged.
+
+        Args:
+            ip_addresses (Iterable[str]): The IP addresses of the printers.
+            deadline (float): The duration of the cycle in seconds, or None to wait for every printer.
+            hedge (bool): Whether to make a second request to slow printers.
+
+        Returns:
+            dict: The PollResult of every printer, keyed by IP address, or the
+                exception raised for the printer: DeviceUnavailableError for skipped printers,
+                DeadlineExceededError for printers missed by the deadline, CreateReportError for printers
+                that did not respond, ReportError for unreadable reports and InvalidAddressError for
+                invalid addresses.
+        """
+        end = None if deadline is None else monotonic() + deadline
+        ip_addresses = list(dict.fromkeys(ip_addresses))
+        hedge = hedge and not (self.limiter and self.limiter.device_concurrency == 1)
+        slots = self._slots()
+        results = {}
+        attempts = {}
+        owners = {}
+        started = {}
+        hedged = set()
+        queue = []
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        def start_queued() -> Optional[float]:
+            """
+            Hand the queued printers the limiter lets in to the free workers, keeping the order of the queue.
+
+            Returns:
+                Optional[float]: The time in seconds until the token buckets let a queued printer in,
+                    or None if no queued printer waits for them.
+            """
+            token_wait = None
+            for ip_address in list(queue):
+                if ip_address in results:
+                    queue.remove(ip_address)  # a hedged printer that already answered
+                    continue
+                if len(owners) >= self.max_workers:
+                    break
+                if self.limiter:
+                    wait_time = self.limiter.try_acquire(ip_address, slots, len(self.pages))
+                    if wait_time is None:
+                        continue
+                    if wait_time:
+                        token_wait = wait_time if token_wait is None else min(token_wait, wait_time)
+                        continue
+                queue.remove(ip_address)
+                future = executor.submit(self._attempt, ip_address, end, started, True)
+                if self.limiter:
+                    future.add_done_callback(lambda _, ip_address=ip_address: self.limiter.release(ip_address, slots))
+                owners[future] = ip_address
+                attempts.setdefault(ip_address, set()).add(future)
+            return token_wait
+
+        try:
+            for ip_address in ip_addresses:
+                if self.health.get(ip_address).allow():
+                    queue.append(ip_address)
+                else:
+                    results[ip_address] = DeviceUnavailableError()
+
+            while attempts or queue:
+                token_wait = start_queued()
+                if not attempts and not queue:
+                    break
+
+                timeout = None if end is None else max(end - monotonic(), 0)
+                if token_wait is not None:
+                    timeout = token_wait if timeout is None else min(timeout, token_wait)
+                if hedge:
+                    hedge_times = [
+                        self._hedge_time(ip_address, started)
+                        for ip_address in attempts if ip_address not in hedged
+                    ]
+                    hedge_times = [hedge_time for hedge_time in hedge_times if hedge_time is not None]
+                    if hedge_times:
+                        hedge_wait = max(min(hedge_times) - monotonic(), 0)
+                        timeout = hedge_wait if timeout is None else min(timeout, hedge_wait)
+
+                if owners:
+                    done, _ = wait(list(owners), timeout=timeout, return_when=FIRST_COMPLETED)
+                else:
+                    sleep(IDLE_WAIT if timeout is None else min(timeout, IDLE_WAIT))  # slots held by other callers
+                    done = ()
+                for future in done:
+                    ip_address = owners.pop(future)
+                    futures = attempts.get(ip_address)
+                    if futures is None:
+                        continue  # the other request of a hedged printer already answered
+                    futures.discard(future)
+                    error = future.exception()
+                    if error is None:
+                        results[ip_address] = future.result()
+                    elif not futures and ip_address not in queue:
+                        results[ip_address] = error
+                    else:
+                        continue  # wait for the other request of a hedged printer
+                    del attempts[ip_address]
+
+                if end is not None and monotonic() >= end:
+                    for ip_address in [*attempts, *queue]:
+                        results.setdefault(ip_address, DeadlineExceededError())
+                    break
+
+                if hedge:
+                    now = monotonic()
+                    for ip_address in list(attempts):
+                        hedge_time = self._hedge_time(ip_address, started)
+                        if ip_address not in hedged and hedge_time is not None and now >= hedge_time:
+                            hedged.add(ip_address)
+                            queue.append(ip_address)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        return {ip_address: results[ip_address] for ip_address in ip_addresses}
+
+    def save(self):
+        """
+        Write the health of the printers and their last report hashes to their JSON files, replacing
+        them atomically. Does nothing for the state kept in memory only.
+        """
+        self.health.save()
+        if not self.memo_path:
+            return
+        temporary_path = self.memo_path.with_name(self.memo_path.name + '.tmp')
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump({ip_address: memo.to_dict() for ip_address, memo in self._memos.items()}, file, indent=2)
+        os.replace(temporary_path, self.memo_path)
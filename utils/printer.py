@@ -2,14 +2,45 @@
 This Python script provides a utility class, 'Device,' for interacting with a networked device
 to retrieve printer statistics. It allows users to check various statistics such as counters
 and serial numbers from a networked printer.
+
+Besides the device statistics report, the supplies and status reports can be fetched with it. All the
+reports of a device are fetched over a single keep-alive session, concurrently up to the concurrency of
+the device, and combined into a single snapshot.
 """
 
+from concurrent.futures import ThreadPoolExecutor
 import ipaddress
+import logging
+from typing import Iterable, Optional
 
 import requests
-from bs4 import BeautifulSoup
 
-from .exceptions import InvalidAddressError, ReportError, CreateReportError
+from . import report
+from .archive import ReportArchive
+from .exceptions import InvalidAddressError, CreateReportError
+
+logger = logging.getLogger(__name__)
+
+PAGES = {
+    'statistics': 'cgi-bin/dynamic/printer/config/reports/devicestatistics.html',
+    'supplies': 'cgi-bin/dynamic/printer/config/reports/supplies.html',
+    'status': 'cgi-bin/dynamic/printer/PrinterStatus.html',
+}
+
+
+def check_pages(pages: Iterable[str]):
+    """
+    Check that every report name is a key of 'PAGES'.
+
+    Args:
+        pages (Iterable[str]): The names of the reports.
+
+    Raises:
+        ValueError: If a report name is unknown.
+    """
+    for page in pages:
+        if page not in PAGES:
+            raise ValueError(f'unknown report {page}')
 
 
 class Device:
@@ -18,33 +49,69 @@ class Device:
 
     Attributes:
         ip_address (str): The IP address of the networked device.
+        verify_rate (float): The fraction of reads cross-checked against the full BeautifulSoup parse.
+        timeout (float): The timeout in seconds of the requests to the device, or None to wait forever.
+        archive (ReportArchive): The archive keeping every fetched report, or None.
+        memo (ReportMemo): The values parsed from the recent reports of the device, or None.
+        unchanged (bool): True if the report is identical to the previous report remembered in the memo.
+        report_hash (str): The SHA-256 hash of the statistics report, or None without a memo.
+        pages (tuple): The names of the reports fetched from the device, keys of 'PAGES'.
+        concurrency (int): The number of reports fetched at the same time.
+        reports (dict): The fetched reports, keyed by name, None for the reports other than the statistics
+            report that could not be fetched.
 
     Methods:
         ip_address_is_valid():
             Check if the provided IP address is valid.
 
         create_report():
-            Fetch the device statistics report from the device's web interface.
+            Fetch the reports from the device's web interface and store the statistics report in the archive, if any.
 
         get_counter():
             Get the current counter value from the device statistics report.
 
         get_serial_number():
             Get the serial number from the device statistics report.
+
+        get_snapshot():
+            Get the values of all the fetched reports in a single record.
     """
-    def __init__(self, ip_address: str):
+    def __init__(
+            self, ip_address: str, verify_rate: float = 0.0, timeout: float = None,
+            archive: Optional[ReportArchive] = None, memo: Optional[report.ReportMemo] = None,
+            pages: Iterable[str] = ('statistics',), concurrency: int = 1,
+    ):
         """
         Initialize the Device object with the IP address of the networked device.
 
         Args:
             ip_address (str): The IP address of the networked device.
+            verify_rate (float): The fraction of reads, between 0 and 1, in which the regex fast path
+                is cross-checked against the full BeautifulSoup parse.
+            timeout (float): The timeout in seconds of the requests to the device, or None to wait forever.
+            archive (Optional[ReportArchive]): The archive keeping every fetched report.
+            memo (Optional[ReportMemo]): The values parsed from the recent reports of the device,
+                shared between the Device objects of the same device to skip parsing unchanged reports.
+            pages (Iterable[str]): The names of the reports fetched from the device, keys of 'PAGES'
+                checked with 'check_pages'.
+            concurrency (int): The number of reports fetched at the same time.
         """
         self.ip_address = ip_address
+        self.verify_rate = verify_rate
+        self.timeout = timeout
+        self.archive = archive
+        self.memo = memo
+        self.unchanged = False
+        self.pages = tuple(pages)
+        self.concurrency = concurrency
+        self.reports = {}
         self._report = None
+        self.report_hash = None
+        self._session = None
 
     def __enter__(self):
         """
-        Enter the context manager. Validates the IP address and creates the device report.
+        Enter the context manager. Validates the IP address, opens the session and creates the device reports.
 
         Raises:
             InvalidAddressError: If the IP address is invalid.
@@ -53,12 +120,20 @@ class Device:
             Device: The Device object.
         """
         if self.ip_address_is_valid():
-            self.create_report()
+            self._session = requests.Session()
+            try:
+                self.create_report()
+            except BaseException:
+                self.__exit__(None, None, None)
+                raise
             return self
         raise InvalidAddressError
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        """Implemented to use Device class as a context manager"""
+        """Exit the context manager, closing the session"""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
     def ip_address_is_valid(self) -> bool:
         """
@@ -73,16 +148,76 @@ class Device:
         except ValueError:
             return False
 
+    def _fetch(self, page: str) -> str:
+        """
+        Fetch a report from the device's web interface, over the session if it is open.
+
+        Args:
+            page (str): The name of the report.
+
+        Raises:
+            CreateReportError: If the device does not respond or the report is not available.
+
+        Returns:
+            str: The raw report.
+        """
+        url = f'http://{self.ip_address}/{PAGES[page]}'
+        get = self._session.get if self._session is not None else requests.get
+        try:
+            response = get(url, timeout=self.timeout)
+        except requests.RequestException as error:
+            raise CreateReportError from error
+        if response.status_code == 200:
+            return response.text
+        raise CreateReportError
+
+    def _fetch_optional(self, page: str) -> Optional[str]:
+        """
+        Fetch a report other than the statistics report, whose failure does not fail the device.
+
+        Args:
+            page (str): The name of the report.
+
+        Returns:
+            Optional[str]: The raw report, or None if it is not available.
+        """
+        try:
+            return self._fetch(page)
+        except CreateReportError:
+            logger.warning('Unable to fetch the %s report of %s', page, self.ip_address)
+            return None
+
     def create_report(self):
         """
-        Fetch the device statistics report from the device's web interface.
+        Fetch the reports from the device's web interface, concurrently up to the concurrency of the device,
+        and store the statistics report in the archive, if any. Only the statistics report is required, the
+        other reports that cannot be fetched are kept as None. Archiving errors are logged, not raised.
+
+        Raises:
+            CreateReportError: If the device does not respond or the statistics report is not available.
         """
-        url = f'http://{self.ip_address}/cgi-bin/dynamic/printer/config/reports/devicestatistics.html'
-        page = requests.get(url)
-        if page.status_code == 200:
-            self._report = page.text
+        def fetch(page: str) -> Optional[str]:
+            return self._fetch(page) if page == 'statistics' else self._fetch_optional(page)
+
+        workers = min(self.concurrency, len(self.pages))
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                reports = list(executor.map(fetch, self.pages))
+        else:
+            reports = [fetch(page) for page in self.pages]
+        self.reports = dict(zip(self.pages, reports))
+
+        self._report = self.reports.get('statistics')
+        if self._report is None:
             return
-        raise CreateReportError
+        if self.memo:
+            self.report_hash = self.memo.hash(self._report)
+            self.unchanged = self.memo.update(self.report_hash)
+        if self.archive:
+            try:
+                self.archive.store(self.ip_address, self._report)
+            except OSError as error:
+                logger.warning('Unable to archive the report of %s: %s', self.ip_address, error)
 
     def get_counter(self) -> str:
         """
@@ -94,13 +229,7 @@ class Device:
         Returns:
             str: The counter value.
         """
-        if self._report:
-            soup = BeautifulSoup(self._report, 'html.parser')
-            table = soup.find_all('table')[4]
-            tr = table.find_all('tr')[-1]
-            counter = tr.find_all('p')[-1].text.strip()
-            return counter
-        raise ReportError
+        return self._memoized('counter', report.get_counter)
 
     def get_serial_number(self) -> str:
         """
@@ -112,10 +241,45 @@ class Device:
         Returns:
             str: The serial number.
         """
-        if self._report:
-            soup = BeautifulSoup(self._report, 'html.parser')
-            table = soup.find_all('table')[10]
-            tr = table.find_all('tr')[2]
-            serial_number = tr.find_all('p')[-1].text.strip()
-            return serial_number
-        raise ReportError
+        return self._memoized('serial_number', report.get_serial_number)
+
+    def _memoized(self, field: str, extract) -> str:
+        """
+        Extract a value from the report, reusing the value parsed before from an identical report.
+
+        Args:
+            field (str): The name of the value.
+            extract (Callable[[str, float], str]): Extracts the value from the report.
+
+        Returns:
+            str: The value.
+        """
+        if not self.memo or not self.report_hash:
+            return extract(self._report, self.verify_rate)
+
+        value = self.memo.get(self.report_hash, field)
+        if value is None:
+            value = extract(self._report, self.verify_rate)
+            self.memo.set(self.report_hash, field, value)
+        return value
+
+    def get_snapshot(self) -> dict:
+        """
+        Get the values of all the fetched reports in a single record.
+
+        Raises:
+            ReportError: If a value cannot be found in its report.
+
+        Returns:
+            dict: The IP address, the serial number and the counter of the statistics report, if fetched,
+                and the label/value pairs of every other report, or None if it could not be fetched,
+                keyed by report name.
+        """
+        snapshot = {'ip_address': self.ip_address}
+        if 'statistics' in self.reports:
+            snapshot['serial_number'] = self.get_serial_number()
+            snapshot['counter'] = self.get_counter()
+        for page, content in self.reports.items():
+            if page != 'statistics':
+                snapshot[page] = None if content is None else report.get_table_values(content)
+        return snapshot
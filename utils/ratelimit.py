@@ -0,0 +1,280 @@
+"""
+This Python module provides a utility class, 'RateLimiter,' for protecting the embedded web servers of
+the printers and the links to the branch offices. Requests are limited per device and per subnet, both
+by token buckets, which bound the request rate while allowing short bursts, and by concurrency caps,
+which bound the number of requests in flight. A request is let in only when both limits of its device
+and of its subnet allow it. Schedulers use 'try_acquire' to start only the requests allowed now, so
+the printers of idle subnets are read at full speed while a busy subnet waits.
+"""
+
+from contextlib import contextmanager
+from ipaddress import ip_network
+from threading import Condition
+from time import monotonic
+from typing import Iterator, Optional
+
+from .exceptions import DeadlineExceededError
+
+
+class TokenBucket:
+    """
+    A token bucket refilled at a constant rate up to its burst size. Not thread safe on its own.
+
+    Attributes:
+        rate (float): The number of tokens added per second.
+        burst (float): The maximum number of tokens.
+        tokens (float): The number of tokens available.
+
+    Methods:
+        wait_time(now: float = None) -> float:
+            Get the time until a token is available.
+
+        take(now: float = None, count: float = 1):
+            Take tokens.
+    """
+    def __init__(self, rate: float, burst: float = 1, now: float = None):
+        """
+        Initialize the TokenBucket object full.
+
+        Args:
+            rate (float): The number of tokens added per second.
+            burst (float): The maximum number of tokens.
+            now (float): The current monotonic time, defaults to the time of the call.
+        """
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self._updated = monotonic() if now is None else now
+
+    def _refill(self, now: float):
+        """
+        Add the tokens accumulated since the last refill.
+
+        Args:
+            now (float): The current monotonic time.
+        """
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, now: float = None) -> float:
+        """
+        Get the time until a token is available.
+
+        Args:
+            now (float): The current monotonic time, defaults to the time of the call.
+
+        Returns:
+            float: The time in seconds, 0 if a token is available now.
+        """
+        self._refill(monotonic() if now is None else now)
+        return max(1 - self.tokens, 0) / self.rate
+
+    def take(self, now: float = None, count: float = 1):
+        """
+        Take tokens once a token is available. Taking more tokens than available leaves the bucket in debt,
+        which delays the next token accordingly.
+
+        Args:
+            now (float): The current monotonic time, defaults to the time of the call.
+            count (float): The number of tokens.
+        """
+        self._refill(monotonic() if now is None else now)
+        self.tokens -= count
+
+
+class RateLimiter:
+    """
+    A utility class limiting the rate and the concurrency of the requests per device and per subnet.
+
+    Attributes:
+        device_rate (float): The requests per second allowed per device, or None for no limit.
+        device_burst (float): The requests a device may get at once after being idle.
+        device_concurrency (int): The requests in flight allowed per device, or None for no limit.
+        subnet_rate (float): The requests per second allowed per subnet, or None for no limit.
+        subnet_burst (float): The requests a subnet may get at once after being idle.
+        subnet_concurrency (int): The requests in flight allowed per subnet, or None for no limit.
+        prefix (int): The prefix length of the IPv4 subnets.
+
+    Methods:
+        subnet(ip_address: str) -> str:
+            Get the subnet of the device.
+
+        max_slots(default: int) -> int:
+            Get the number of slots a device may hold at once.
+
+        try_acquire(ip_address: str, slots: int = 1, requests: int = None) -> Optional[float]:
+            Count requests to the device in if they are allowed now.
+
+        acquire(ip_address: str, end: float = None, slots: int = 1, requests: int = None):
+            Wait until requests to the device are allowed.
+
+        release(ip_address: str, slots: int = 1):
+            Mark requests to the device as finished.
+
+        slot(ip_address: str, end: float = None, slots: int = 1, requests: int = None):
+            A context manager holding request slots of the device.
+    """
+    def __init__(
+            self, device_rate: Optional[float] = None, device_burst: float = 1,
+            device_concurrency: Optional[int] = 1, subnet_rate: Optional[float] = None,
+            subnet_burst: float = 1, subnet_concurrency: Optional[int] = None, prefix: int = 24,
+    ):
+        """
+        Initialize the RateLimiter object.
+
+        Args:
+            device_rate (Optional[float]): The requests per second allowed per device.
+            device_burst (float): The requests a device may get at once after being idle.
+            device_concurrency (Optional[int]): The requests in flight allowed per device.
+            subnet_rate (Optional[float]): The requests per second allowed per subnet.
+            subnet_burst (float): The requests a subnet may get at once after being idle.
+            subnet_concurrency (Optional[int]): The requests in flight allowed per subnet.
+            prefix (int): The prefix length of the IPv4 subnets.
+        """
+        self.device_rate = device_rate
+        self.device_burst = device_burst
+        self.device_concurrency = device_concurrency
+        self.subnet_rate = subnet_rate
+        self.subnet_burst = subnet_burst
+        self.subnet_concurrency = subnet_concurrency
+        self.prefix = prefix
+        self._buckets = {}
+        self._active = {}
+        self._condition = Condition()
+
+    def subnet(self, ip_address: str) -> str:
+        """
+        Get the subnet of the device.
+
+        Args:
+            ip_address (str): The IP address of the device.
+
+        Returns:
+            str: The subnet in CIDR notation.
+        """
+        return str(ip_network(f'{ip_address}/{self.prefix}', strict=False))
+
+    def max_slots(self, default: int) -> int:
+        """
+        Get the number of slots a device may hold at once, bounded by the concurrency caps.
+
+        Args:
+            default (int): The number of slots wanted.
+
+        Returns:
+            int: The number of slots, at least 1.
+        """
+        caps = [cap for cap in (self.device_concurrency, self.subnet_concurrency) if cap is not None]
+        return max(min([default, *caps]), 1)
+
+    def _limits(self, ip_address: str) -> list:
+        """
+        Get the limits applying to the device.
+
+        Args:
+            ip_address (str): The IP address of the device.
+
+        Returns:
+            list: The key, token bucket or None and concurrency cap or None of the device and of its subnet.
+        """
+        limits = []
+        for key, rate, burst, concurrency in (
+                (ip_address, self.device_rate, self.device_burst, self.device_concurrency),
+                (self.subnet(ip_address), self.subnet_rate, self.subnet_burst, self.subnet_concurrency),
+        ):
+            bucket = None
+            if rate:
+                bucket = self._buckets.get(key)
+                if bucket is None:
+                    bucket = self._buckets[key] = TokenBucket(rate, burst)
+            limits.append((key, bucket, concurrency))
+        return limits
+
+    def try_acquire(self, ip_address: str, slots: int = 1, requests: int = None) -> Optional[float]:
+        """
+        Count the requests to the device in if both the limits of the device and of its subnet allow them now.
+
+        Args:
+            ip_address (str): The IP address of the device.
+            slots (int): The number of requests in flight at once, at most 'max_slots'.
+            requests (int): The number of requests taken from the token buckets, defaults to 'slots'.
+
+        Returns:
+            Optional[float]: 0 if the requests were counted in, the time in seconds until the token buckets
+                allow them, or None if they wait for requests in flight to finish.
+        """
+        with self._condition:
+            limits = self._limits(ip_address)
+            now = monotonic()
+            if not all(concurrency is None or self._active.get(key, 0) + slots <= concurrency
+                       for key, _, concurrency in limits):
+                return None
+            wait = max(bucket.wait_time(now) if bucket else 0 for _, bucket, _ in limits)
+            if wait:
+                return wait
+            for key, bucket, _ in limits:
+                if bucket:
+                    bucket.take(now, slots if requests is None else requests)
+                self._active[key] = self._active.get(key, 0) + slots
+            return 0
+
+    def acquire(self, ip_address: str, end: float = None, slots: int = 1, requests: int = None):
+        """
+        Wait until both the limits of the device and of its subnet allow the requests, then count them in.
+
+        Args:
+            ip_address (str): The IP address of the device.
+            end (float): The monotonic time after which waiting is given up, or None to wait as long as needed.
+            slots (int): The number of requests in flight at once, at most 'max_slots'.
+            requests (int): The number of requests taken from the token buckets, defaults to 'slots'.
+
+        Raises:
+            DeadlineExceededError: If the request is not allowed before the end time.
+        """
+        with self._condition:
+            while True:
+                wait = self.try_acquire(ip_address, slots, requests)
+                if wait == 0:
+                    return
+
+                now = monotonic()
+                if end is not None:
+                    if now >= end:
+                        raise DeadlineExceededError
+                    wait = end - now if wait is None else min(wait, end - now)
+                self._condition.wait(wait)
+
+    def release(self, ip_address: str, slots: int = 1):
+        """
+        Mark requests to the device as finished, letting the waiting requests in.
+
+        Args:
+            ip_address (str): The IP address of the device.
+            slots (int): The number of slots acquired.
+        """
+        with self._condition:
+            for key in (ip_address, self.subnet(ip_address)):
+                self._active[key] -= slots
+                if not self._active[key]:
+                    del self._active[key]
+            self._condition.notify_all()
+
+    @contextmanager
+    def slot(self, ip_address: str, end: float = None, slots: int = 1, requests: int = None) -> Iterator[None]:
+        """
+        A context manager holding request slots of the device for the duration of the block.
+
+        Args:
+            ip_address (str): The IP address of the device.
+            end (float): The monotonic time after which waiting is given up, or None to wait as long as needed.
+            slots (int): The number of requests in flight at once, at most 'max_slots'.
+            requests (int): The number of requests taken from the token buckets, defaults to 'slots'.
+
+        Raises:
+            DeadlineExceededError: If the request is not allowed before the end time.
+        """
+        self.acquire(ip_address, end, slots, requests)
+        try:
+            yield
+        finally:
+            self.release(ip_address, slots)
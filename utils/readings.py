@@ -0,0 +1,222 @@
+"""
+This Python module provides a utility class, 'ReadingStore,' for keeping the last counter reading
+of every device between runs. It compares each new reading with the stored one and tells which
+devices are worth reporting: new devices, changed counters, monthly threshold crossings and
+devices that stopped (or started again) responding.
+"""
+
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import re
+from typing import Optional
+
+NEW_DEVICE = 'new device'
+COUNTER_CHANGED = 'counter changed'
+THRESHOLD_CROSSED = 'monthly threshold crossed'
+NOT_RESPONDING = 'not responding'
+UNREADABLE = 'report cannot be read'
+RESPONDING_AGAIN = 'responding again'
+
+
+def counter_value(counter: str) -> int:
+    """
+    Convert a counter read from the device report to an integer.
+
+    Args:
+        counter (str): The counter value, possibly with thousands separators.
+
+    Raises:
+        ValueError: If the counter does not contain any digits.
+
+    Returns:
+        int: The counter value.
+    """
+    return int(re.sub(r'\D', '', counter))
+
+
+class ReadingStore:
+    """
+    A utility class for storing the last reading of every device in a JSON file and detecting changes.
+
+    Attributes:
+        path (Path): The path to the JSON file with the stored readings.
+        monthly_threshold (int): The number of pages per month above which a device is reported, or None.
+        devices (dict): The last reading of every device, keyed by serial number.
+        unreachable (set): The IP addresses of devices that never responded.
+
+    Methods:
+        save():
+            Write the stored readings to the JSON file.
+
+        update(ip_address: str, serial_number: str, counter: str, now: datetime = None,
+               report_hash: str = None) -> Optional[dict]:
+            Store a new reading and return the change to report, if any.
+
+        is_unchanged(ip_address: str, serial_number: str, report_hash: str) -> bool:
+            Check if the device served the same report as for its stored reading.
+
+        mark_unreachable(ip_address: str, reason: str = NOT_RESPONDING) -> Optional[dict]:
+            Record that a device did not respond and return the change to report, if any.
+    """
+    def __init__(self, path: Path, monthly_threshold: Optional[int] = None):
+        """
+        Initialize the ReadingStore object and load the stored readings, if the file exists.
+
+        Args:
+            path (Path): The path to the JSON file with the stored readings.
+            monthly_threshold (Optional[int]): The number of pages per month above which a device is reported.
+        """
+        self.path = Path(path)
+        self.monthly_threshold = monthly_threshold
+        self.devices = {}
+        self.unreachable = set()
+
+        if self.path.exists():
+            with open(self.path, 'r', encoding='utf-8') as file:
+                content = json.load(file)
+            self.devices = content.get('devices', {})
+            self.unreachable = set(content.get('unreachable', []))
+
+    def save(self):
+        """
+        Write the stored readings to the JSON file, replacing it atomically.
+        """
+        temporary_path = self.path.with_name(self.path.name + '.tmp')
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump({'devices': self.devices, 'unreachable': sorted(self.unreachable)}, file, indent=2)
+        os.replace(temporary_path, self.path)
+
+    def _serial_number(self, ip_address: str) -> Optional[str]:
+        """
+        Find the serial number of the device last seen at the given IP address.
+
+        Args:
+            ip_address (str): The IP address of the device.
+
+        Returns:
+            Optional[str]: The serial number, or None if no device was seen at the address.
+        """
+        for serial_number, record in self.devices.items():
+            if record['ip_address'] == ip_address:
+                return serial_number
+        return None
+
+    def update(
+            self, ip_address: str, serial_number: str, counter: str, now: datetime = None,
+            report_hash: Optional[str] = None,
+    ) -> Optional[dict]:
+        """
+        Store a new reading and compare it with the previous reading of the same serial number.
+
+        Args:
+            ip_address (str): The IP address of the device.
+            serial_number (str): The serial number of the device.
+            counter (str): The counter value read from the device.
+            now (datetime): The time of the reading, defaults to the current time.
+            report_hash (Optional[str]): The hash of the report the reading was read from.
+
+        Returns:
+            Optional[dict]: The change to report, or None if nothing worth reporting happened.
+        """
+        now = now or datetime.now()
+        month = now.strftime('%Y-%m')
+        value = counter_value(counter)
+        previous = self.devices.get(serial_number)
+        self.unreachable.discard(ip_address)
+
+        reasons = []
+        if previous is None:
+            reasons.append(NEW_DEVICE)
+            delta = 0
+            month_start = value
+            previous_month_pages = 0
+        else:
+            delta = value - previous['counter']
+            if previous['month'] == month:
+                month_start = previous['month_start']
+                previous_month_pages = previous['counter'] - month_start
+            else:
+                month_start = previous['counter']
+                previous_month_pages = 0
+            if not previous['responding']:
+                reasons.append(RESPONDING_AGAIN)
+            if delta:
+                reasons.append(COUNTER_CHANGED)
+
+        month_pages = value - month_start
+        if self.monthly_threshold and previous_month_pages < self.monthly_threshold <= month_pages:
+            reasons.append(THRESHOLD_CROSSED)
+
+        self.devices[serial_number] = {
+            'ip_address': ip_address,
+            'counter': value,
+            'time': now.isoformat(timespec='seconds'),
+            'month': month,
+            'month_start': month_start,
+            'responding': True,
+            'report_hash': report_hash,
+        }
+
+        if not reasons:
+            return None
+        return {
+            'ip_address': ip_address,
+            'serial_number': serial_number,
+            'counter': value,
+            'delta': delta,
+            'month_pages': month_pages,
+            'reasons': reasons,
+        }
+
+    def is_unchanged(self, ip_address: str, serial_number: str, report_hash: Optional[str]) -> bool:
+        """
+        Check if the device served the same report as for its stored reading, so the reading can be
+        skipped. A device that stopped responding or moved to another address is never unchanged.
+
+        Args:
+            ip_address (str): The IP address of the device.
+            serial_number (str): The serial number of the device.
+            report_hash (Optional[str]): The hash of the report, or None if it is not known.
+
+        Returns:
+            bool: True if the stored reading was read from the same report, False otherwise.
+        """
+        record = self.devices.get(serial_number)
+        return bool(
+            report_hash and record and record['responding'] and record['ip_address'] == ip_address
+            and record.get('report_hash') == report_hash
+        )
+
+    def mark_unreachable(self, ip_address: str, reason: str = NOT_RESPONDING) -> Optional[dict]:
+        """
+        Record that the device at the given IP address did not respond, or that its report could not be read.
+
+        A device is reported only the first time it stops responding.
+
+        Args:
+            ip_address (str): The IP address of the device.
+            reason (str): The reason reported, NOT_RESPONDING or UNREADABLE.
+
+        Returns:
+            Optional[dict]: The change to report, or None if the device was already known to be down.
+        """
+        serial_number = self._serial_number(ip_address)
+        if serial_number is None:
+            if ip_address in self.unreachable:
+                return None
+            self.unreachable.add(ip_address)
+            return {'ip_address': ip_address, 'serial_number': None, 'reasons': [reason]}
+
+        record = self.devices[serial_number]
+        if not record['responding']:
+            return None
+        record['responding'] = False
+        return {
+            'ip_address': ip_address,
+            'serial_number': serial_number,
+            'counter': record['counter'],
+            'last_seen': record['time'],
+            'reasons': [reason],
+        }
@@ -0,0 +1,119 @@
+"""
+This Python module provides functions for extracting counters and serial numbers from a directory of
+saved device statistics reports. The reports are parsed across a multiprocessing pool with the same
+extraction logic as the 'Device' class, and every result is appended to a JSON Lines file as soon as
+it is ready, so an interrupted run resumes where it stopped.
+"""
+
+from functools import partial
+import json
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from . import report
+from .exceptions import ReportError
+
+
+def find_reports(directory: Path, pattern: str = '*.html') -> list:
+    """
+    Find the saved reports in the directory and its subdirectories.
+
+    Args:
+        directory (Path): The directory with the saved reports.
+        pattern (str): The glob pattern of the report file names.
+
+    Returns:
+        list: The paths of the reports as strings, sorted.
+    """
+    return sorted(str(path) for path in Path(directory).rglob(pattern) if path.is_file())
+
+
+def parse_file(path: str, verify_rate: float = 0.0) -> dict:
+    """
+    Extract the serial number and the counter from a saved report.
+
+    Args:
+        path (str): The path of the report.
+        verify_rate (float): The fraction of values cross-checked against the full BeautifulSoup parse.
+
+    Returns:
+        dict: The path, serial number and counter of the report, with an error message
+            instead of the values if they cannot be extracted.
+    """
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as file:
+            content = file.read()
+        return {
+            'path': path,
+            'serial_number': report.get_serial_number(content, verify_rate),
+            'counter': report.get_counter(content, verify_rate),
+        }
+    except (OSError, ReportError) as error:
+        return {'path': path, 'error': repr(error)}
+
+
+def completed_paths(output: Path) -> set:
+    """
+    Get the paths of the reports already written to the output file.
+
+    Args:
+        output (Path): The JSON Lines output file.
+
+    Returns:
+        set: The paths of the parsed reports.
+    """
+    output = Path(output)
+    if not output.exists():
+        return set()
+
+    completed = set()
+    with open(output, 'r', encoding='utf-8') as file:
+        for line in file:
+            try:
+                completed.add(json.loads(line)['path'])
+            except (ValueError, KeyError):
+                continue  # a line cut short by an interruption is parsed again
+    return completed
+
+
+def reparse(
+        paths: Iterable[str], output: Path, processes: Optional[int] = None,
+        progress: Optional[Callable[[int, int], None]] = None, verify_rate: float = 0.0,
+) -> int:
+    """
+    Parse the reports across a multiprocessing pool and append the results to the output file.
+    Reports already present in the output file are skipped.
+
+    Args:
+        paths (Iterable[str]): The paths of the reports.
+        output (Path): The JSON Lines output file.
+        processes (Optional[int]): The number of worker processes, defaults to the number of CPUs.
+        progress (Optional[Callable[[int, int], None]]): Called with the number of parsed and total
+            reports after every parsed report.
+        verify_rate (float): The fraction of values cross-checked against the full BeautifulSoup parse.
+
+    Returns:
+        int: The number of reports parsed in this run.
+    """
+    completed = completed_paths(output)
+    pending = [path for path in paths if path not in completed]
+    total = len(pending)
+    if not total:
+        return 0
+
+    with open(output, 'a+b') as file:
+        if file.tell():
+            file.seek(-1, 2)
+            if file.read(1) != b'\n':
+                file.write(b'\n')  # end the line cut short by an interruption
+
+    with open(output, 'a', encoding='utf-8') as file, Pool(processes) as pool:
+        done = 0
+        for result in pool.imap_unordered(partial(parse_file, verify_rate=verify_rate), pending, chunksize=16):
+            file.write(json.dumps(result) + '\n')
+            file.flush()
+            done += 1
+            if progress:
+                progress(done, total)
+    return done
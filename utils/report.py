@@ -0,0 +1,312 @@
+"""
+This Python module provides functions for extracting values from the device statistics report.
+Every value is read with a compiled-regex fast path over the raw report and falls back to
+a full BeautifulSoup parse when the fast path cannot match the markup. A sampling verification
+mode cross-checks both paths to catch firmware layouts the fast path misreads.
+
+The supplies and status reports are read as label/value pairs of their table rows with
+'get_table_values'.
+
+A 'ReportMemo' keeps the values parsed from the last few reports of a device keyed by content hash,
+so a byte-identical report is not parsed again.
+"""
+
+from collections import OrderedDict
+import hashlib
+from html import unescape
+import logging
+import random
+import re
+from typing import Optional
+
+from .exceptions import ReportError
+
+logger = logging.getLogger(__name__)
+
+COUNTER_CELL = (4, -1)
+SERIAL_NUMBER_CELL = (10, 2)
+
+_TABLE_OPEN = re.compile(r'<table\b', re.IGNORECASE)
+_TABLE_CLOSE = re.compile(r'</table\s*>', re.IGNORECASE)
+_ROW_OPEN = re.compile(r'<tr\b', re.IGNORECASE)
+_ROW = re.compile(r'<tr\b[^>]*>(.*?)</tr\s*>', re.IGNORECASE | re.DOTALL)
+_PARAGRAPH_OPEN = re.compile(r'<p\b', re.IGNORECASE)
+_PARAGRAPH = re.compile(r'<p\b[^>]*>(.*?)</p\s*>', re.IGNORECASE | re.DOTALL)
+_CELL = re.compile(r'<t[dh]\b[^>]*>(.*?)</t[dh]\s*>', re.IGNORECASE | re.DOTALL)
+_TAG = re.compile(r'<[^>]*>')
+_HIDDEN = re.compile(
+    r'<!--.*?-->|<(script|style)\b[^>]*>.*?</\1\s*>', re.IGNORECASE | re.DOTALL,
+)
+_HIDDEN_OPEN = re.compile(r'<!--|<script\b|<style\b', re.IGNORECASE)
+
+
+class ReportMemo:
+    """
+    A small per-device memo of the values parsed from its reports, keyed by report hash.
+
+    Attributes:
+        size (int): The number of reports remembered.
+        last_hash (str): The hash of the most recent report, or None.
+
+    Methods:
+        hash(report: str) -> str:
+            Get the content hash of a report.
+
+        update(report_hash: str) -> bool:
+            Record a new report and check if it is identical to the previous one.
+
+        get(report_hash: str, field: str) -> Optional[str]:
+            Get a value parsed from the report before.
+
+        set(report_hash: str, field: str, value: str):
+            Remember a value parsed from the report.
+
+        to_dict() -> dict:
+            Get the hash and the values of the most recent report, to persist them.
+
+        load(state: dict):
+            Restore the hash and the values of the most recent report.
+    """
+    def __init__(self, size: int = 4):
+        """
+        Initialize the ReportMemo object.
+
+        Args:
+            size (int): The number of reports remembered.
+        """
+        self.size = size
+        self.last_hash = None
+        self._values = OrderedDict()
+
+    @staticmethod
+    def hash(report: str) -> str:
+        """
+        Get the content hash of a report.
+
+        Args:
+            report (str): The raw device report.
+
+        Returns:
+            str: The SHA-256 hash of the report.
+        """
+        return hashlib.sha256(report.encode('utf-8')).hexdigest()
+
+    def update(self, report_hash: str) -> bool:
+        """
+        Record a new report of the device and check if it is identical to the previous one.
+
+        Args:
+            report_hash (str): The hash of the new report.
+
+        Returns:
+            bool: True if the report did not change since the previous one, False otherwise.
+        """
+        unchanged = report_hash == self.last_hash
+        self.last_hash = report_hash
+        return unchanged
+
+    def get(self, report_hash: str, field: str) -> Optional[str]:
+        """
+        Get a value parsed from the report before.
+
+        Args:
+            report_hash (str): The hash of the report.
+            field (str): The name of the value.
+
+        Returns:
+            Optional[str]: The value, or None if it was not parsed from the report yet.
+        """
+        values = self._values.get(report_hash)
+        if values is None:
+            return None
+        self._values.move_to_end(report_hash)
+        return values.get(field)
+
+    def set(self, report_hash: str, field: str, value: str):
+        """
+        Remember a value parsed from the report, forgetting the least recently used report if needed.
+
+        Args:
+            report_hash (str): The hash of the report.
+            field (str): The name of the value.
+            value (str): The parsed value.
+        """
+        self._values.setdefault(report_hash, {})[field] = value
+        self._values.move_to_end(report_hash)
+        while len(self._values) > self.size:
+            self._values.popitem(last=False)
+
+    def to_dict(self) -> dict:
+        """
+        Get the hash and the values of the most recent report, to persist them.
+
+        Returns:
+            dict: The hash and the values of the most recent report.
+        """
+        return {'last_hash': self.last_hash, 'values': self._values.get(self.last_hash, {})}
+
+    def load(self, state: dict):
+        """
+        Restore the hash and the values of the most recent report.
+
+        Args:
+            state (dict): The state returned by 'to_dict'.
+        """
+        self.last_hash = state.get('last_hash')
+        if self.last_hash and state.get('values'):
+            self._values[self.last_hash] = dict(state['values'])
+
+
+def fast_cell(report: str, table_index: int, row_index: int) -> Optional[str]:
+    """
+    Read the text of the last paragraph in the given row of the given table without building
+    a document tree.
+
+    Args:
+        report (str): The raw device statistics report.
+        table_index (int): The index of the table in document order.
+        row_index (int): The index of the row within the table.
+
+    Returns:
+        Optional[str]: The stripped cell text, or None if the markup does not have the expected shape.
+    """
+    if _HIDDEN_OPEN.search(report):
+        # comments and scripts are not part of the document tree the full parser builds
+        report = _HIDDEN.sub('', report)
+        if _HIDDEN_OPEN.search(report):
+            return None  # unterminated, left to the full parser
+    table_match = None
+    for table_match in _TABLE_OPEN.finditer(report):
+        if table_index == 0:
+            break
+        table_index -= 1
+    else:
+        return None
+
+    close_match = _TABLE_CLOSE.search(report, table_match.end())
+    if close_match is None:
+        return None
+    table = report[table_match.end():close_match.start()]
+    if _TABLE_OPEN.search(table):
+        return None  # nested tables are left to the full parser
+
+    rows = _ROW.findall(table)
+    if not rows or len(rows) != len(_ROW_OPEN.findall(table)):
+        return None
+    try:
+        row = rows[row_index]
+    except IndexError:
+        return None
+
+    paragraphs = _PARAGRAPH.findall(row)
+    if not paragraphs or len(paragraphs) != len(_PARAGRAPH_OPEN.findall(row)):
+        return None
+    return unescape(_TAG.sub('', paragraphs[-1])).strip()
+
+
+def soup_cell(report: str, table_index: int, row_index: int) -> str:
+    """
+    Read the text of the last paragraph in the given row of the given table using BeautifulSoup.
+
+    Args:
+        report (str): The raw device statistics report.
+        table_index (int): The index of the table in document order.
+        row_index (int): The index of the row within the table.
+
+    Raises:
+        ReportError: If the cell cannot be found in the report.
+
+    Returns:
+        str: The stripped cell text.
+    """
+    from bs4 import BeautifulSoup  # imported lazily, the fast path does not need it
+
+    soup = BeautifulSoup(report, 'html.parser')
+    try:
+        table = soup.find_all('table')[table_index]
+        tr = table.find_all('tr')[row_index]
+        return tr.find_all('p')[-1].text.strip()
+    except IndexError as error:
+        raise ReportError from error
+
+
+def extract_cell(report: str, table_index: int, row_index: int, verify_rate: float = 0.0) -> str:
+    """
+    Read a cell from the report using the fast path, falling back to BeautifulSoup.
+
+    Args:
+        report (str): The raw device statistics report.
+        table_index (int): The index of the table in document order.
+        row_index (int): The index of the row within the table.
+        verify_rate (float): The fraction of calls, between 0 and 1, in which a fast path result
+            is cross-checked against BeautifulSoup. On a mismatch the BeautifulSoup result is returned.
+
+    Raises:
+        ReportError: If the report is empty or the cell cannot be found.
+
+    Returns:
+        str: The stripped cell text.
+    """
+    if not report:
+        raise ReportError
+
+    value = fast_cell(report, table_index, row_index)
+    if value is None:
+        return soup_cell(report, table_index, row_index)
+
+    if verify_rate and random.random() < verify_rate:
+        expected = soup_cell(report, table_index, row_index)
+        if value != expected:
+            logger.warning(
+                'Fast path mismatch at table %s, row %s: %r != %r', table_index, row_index, value, expected
+            )
+            return expected
+    return value
+
+
+def get_counter(report: str, verify_rate: float = 0.0) -> str:
+    """
+    Get the counter value from the device statistics report.
+
+    Args:
+        report (str): The raw device statistics report.
+        verify_rate (float): The fraction of calls cross-checked against BeautifulSoup.
+
+    Returns:
+        str: The counter value.
+    """
+    return extract_cell(report, *COUNTER_CELL, verify_rate=verify_rate)
+
+
+def get_serial_number(report: str, verify_rate: float = 0.0) -> str:
+    """
+    Get the serial number from the device statistics report.
+
+    Args:
+        report (str): The raw device statistics report.
+        verify_rate (float): The fraction of calls cross-checked against BeautifulSoup.
+
+    Returns:
+        str: The serial number.
+    """
+    return extract_cell(report, *SERIAL_NUMBER_CELL, verify_rate=verify_rate)
+
+
+def get_table_values(report: str) -> dict:
+    """
+    Get the label/value pairs from the table rows of a report, such as the supplies or status report.
+    The first cell of a row is the label and the last one is the value, rows with fewer cells are skipped.
+
+    Args:
+        report (str): The raw device report.
+
+    Returns:
+        dict: The values keyed by label, in document order, empty for an empty report.
+    """
+    values = {}
+    for row in _ROW.findall(report):
+        cells = [' '.join(unescape(_TAG.sub(' ', cell)).split()) for cell in _CELL.findall(row)]
+        cells = [cell for cell in cells if cell]
+        if len(cells) >= 2:
+            values[cells[0].rstrip(':').strip()] = cells[-1]
+    return values
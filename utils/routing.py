@@ -0,0 +1,162 @@
+"""
+This Python module provides a utility class, 'Router,' for deciding who receives the statistics of
+which printer and through which SMTP server. Routes are read from a JSON file:
+
+    {
+        "servers": {
+            "relay": {"smtp_server": "smtp.example.com", "port": 587, "login": "...",
+                      "password": "...", "encryption": "TLS"}
+        },
+        "groups": {"accounting": ["192.168.1.10", "701545HH0NLT2"]},
+        "routes": [
+            {"groups": ["accounting"], "receivers": ["accounting@example.com"], "server": "relay"},
+            {"devices": ["192.168.1.20"], "receivers": ["it@example.com"]}
+        ]
+    }
+
+Devices and group members are IP addresses or serial numbers. Every route needs receivers. A route without
+a server uses the default server, and printers matched by no route are sent to the default receiver, or
+left out with a warning if there is none. Messages are grouped by server settings, so every SMTP server
+gets a single connection carrying all of its messages.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Iterable, Optional
+
+DEFAULT_SERVER = 'default'
+SERVER_KEYS = ('smtp_server', 'login', 'password', 'port', 'encryption')
+
+logger = logging.getLogger(__name__)
+
+
+class Router:
+    """
+    A utility class routing the statistics of the printers to receivers and SMTP servers.
+
+    Attributes:
+        servers (dict): The SMTP server settings, keyed by name, including the default server.
+        groups (dict): The IP addresses and serial numbers of the printers, keyed by group name.
+        routes (list): The routes, each with the devices, groups, receivers and server name.
+        default_receiver (str): The receiver of the printers matched by no route, or None.
+
+    Methods:
+        from_file(path: Path, default_receiver: str, default_server: dict) -> Router:
+            Create the router from a JSON file.
+
+        receivers(ip_address: str, serial_number: str = None) -> list:
+            Get the server names and receivers of the printer.
+
+        route(items: Iterable[tuple]) -> list:
+            Group the items by SMTP server settings and receiver.
+    """
+    def __init__(self, config: dict, default_receiver: Optional[str], default_server: dict):
+        """
+        Initialize the Router object.
+
+        Args:
+            config (dict): The routing configuration with the 'servers', 'groups' and 'routes' keys.
+            default_receiver (Optional[str]): The receiver of the printers matched by no route.
+            default_server (dict): The settings of the default SMTP server.
+
+        Raises:
+            ValueError: If a route misses its receivers or refers to an unknown server or group, or if
+                a server that may be used misses a setting.
+        """
+        self.servers = {DEFAULT_SERVER: default_server, **config.get('servers', {})}
+        self.groups = {name: set(members) for name, members in config.get('groups', {}).items()}
+        self.routes = config.get('routes', [])
+        self.default_receiver = default_receiver
+
+        used = set(config.get('servers', {}))
+        if default_receiver:
+            used.add(DEFAULT_SERVER)
+        for route in self.routes:
+            if not route.get('receivers'):
+                raise ValueError('route without receivers')
+            if route.get('server', DEFAULT_SERVER) not in self.servers:
+                raise ValueError(f"unknown server {route['server']}")
+            used.add(route.get('server', DEFAULT_SERVER))
+            for group in route.get('groups', []):
+                if group not in self.groups:
+                    raise ValueError(f'unknown group {group}')
+        for name in used:
+            missing = [key for key in SERVER_KEYS if self.servers[name].get(key) is None]
+            if missing:
+                raise ValueError(f"server {name} misses {', '.join(missing)}")
+
+    @classmethod
+    def from_file(cls, path: Path, default_receiver: Optional[str], default_server: dict) -> 'Router':
+        """
+        Create the router from a JSON file.
+
+        Args:
+            path (Path): The path to the JSON file with the routing configuration.
+            default_receiver (Optional[str]): The receiver of the printers matched by no route.
+            default_server (dict): The settings of the default SMTP server.
+
+        Returns:
+            Router: The router.
+        """
+        with open(path, 'r', encoding='utf-8') as file:
+            return cls(json.load(file), default_receiver, default_server)
+
+    def _matches(self, route: dict, keys: set) -> bool:
+        """
+        Check if the route applies to the printer.
+
+        Args:
+            route (dict): The route.
+            keys (set): The IP address and the serial number of the printer.
+
+        Returns:
+            bool: True if the route applies to the printer, False otherwise.
+        """
+        if keys & set(route.get('devices', [])):
+            return True
+        return any(keys & self.groups[group] for group in route.get('groups', []))
+
+    def receivers(self, ip_address: str, serial_number: str = None) -> list:
+        """
+        Get the server names and receivers of the printer.
+
+        Args:
+            ip_address (str): The IP address of the printer.
+            serial_number (str): The serial number of the printer, or None if it is not known.
+
+        Returns:
+            list: The unique (server name, receiver) pairs of the printer.
+        """
+        keys = {ip_address, serial_number} - {None}
+        pairs = []
+        for route in self.routes:
+            if self._matches(route, keys):
+                server = route.get('server', DEFAULT_SERVER)
+                pairs.extend((server, receiver) for receiver in route['receivers'])
+        if not pairs:
+            if not self.default_receiver:
+                logger.warning('No receiver for printer %s, its statistics are not sent', ip_address)
+                return []
+            pairs.append((DEFAULT_SERVER, self.default_receiver))
+        return list(dict.fromkeys(pairs))
+
+    def route(self, items: Iterable[tuple]) -> list:
+        """
+        Group the items by SMTP server settings and receiver, keeping their order. Servers with
+        identical settings are merged, so they share a connection.
+
+        Args:
+            items (Iterable[tuple]): The IP address, serial number and payload of every printer.
+
+        Returns:
+            list: The (server settings, {receiver: [payload, ...]}) pair of every SMTP server.
+        """
+        grouped = {}
+        for ip_address, serial_number, payload in items:
+            for server, receiver in self.receivers(ip_address, serial_number):
+                settings = self.servers[server]
+                key = tuple(sorted(settings.items()))
+                messages = grouped.setdefault(key, (settings, {}))[1]
+                messages.setdefault(receiver, []).append(payload)
+        return list(grouped.values())
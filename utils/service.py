@@ -0,0 +1,257 @@
+"""
+This Python module provides a small read-only HTTP/JSON service for the latest printer counters. Counters
+are kept in an in-memory index keyed by IP address and serial number and refreshed on demand when they are
+older than the freshness bound. Concurrent requests for the same printer share a single in-flight fetch,
+so a printer never sees more than one request at a time.
+
+Endpoints:
+    GET /devices                  The cached readings of every printer, without refreshing them.
+    GET /devices/<IP address>     The reading of the printer, refreshed if stale.
+    GET /serial/<serial number>   The reading of the printer with the serial number, refreshed if stale.
+    GET /history/<IP address>     The recent [timestamp, counter] readings of the printer, the oldest first.
+
+Printers that are not indexed are answered with 404, printers whose report cannot be fetched or read with 502.
+
+The 'max_age' query parameter overrides the freshness bound in seconds.
+"""
+
+from concurrent.futures import Future
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from threading import Lock
+from time import time
+from typing import Callable, Iterable, Optional
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .exceptions import CreateReportError, ReportError
+from .history import ReadingHistory
+from .readings import counter_value
+
+
+class CounterIndex:
+    """
+    A utility class keeping the latest reading of every printer and refreshing it on demand.
+
+    Attributes:
+        ip_addresses (list): The IP addresses of the printers that may be queried.
+        max_age (float): The age in seconds after which a reading is refreshed.
+        history (ReadingHistory): The recent readings of every printer, keyed by IP address.
+
+    Methods:
+        get(ip_address: str, max_age: float = None) -> dict:
+            Get the reading of the printer, refreshing it if it is stale.
+
+        find(serial_number: str) -> Optional[str]:
+            Get the IP address of the printer with the serial number.
+
+        readings() -> list:
+            Get the cached readings of every printer.
+    """
+    def __init__(
+            self, ip_addresses: Iterable[str], read: Callable[[str], tuple], max_age: float = 60,
+            history: Optional[ReadingHistory] = None,
+    ):
+        """
+        Initialize the CounterIndex object.
+
+        Args:
+            ip_addresses (Iterable[str]): The IP addresses of the printers that may be queried.
+            read (Callable[[str], tuple]): Reads the serial number and the counter from the printer.
+            max_age (float): The age in seconds after which a reading is refreshed.
+            history (Optional[ReadingHistory]): The recent readings of every printer, a new one by default.
+        """
+        self.ip_addresses = list(ip_addresses)
+        self.max_age = max_age
+        self.history = history if history is not None else ReadingHistory()
+        self._read = read
+        self._readings = {}
+        self._serial_numbers = {}
+        self._in_flight = {}
+        self._lock = Lock()
+
+    def _fetch(self, ip_address: str) -> dict:
+        """
+        Read the printer, sharing the in-flight fetch with concurrent callers.
+
+        Args:
+            ip_address (str): The IP address of the printer.
+
+        Raises:
+            CreateReportError: If the device report cannot be created.
+
+        Returns:
+            dict: The new reading of the printer.
+        """
+        with self._lock:
+            future = self._in_flight.get(ip_address)
+            owner = future is None
+            if owner:
+                future = self._in_flight[ip_address] = Future()
+
+        if not owner:
+            return future.result()
+
+        try:
+            serial_number, counter = self._read(ip_address)
+        except BaseException as error:
+            with self._lock:
+                del self._in_flight[ip_address]
+            future.set_exception(error)
+            raise
+
+        reading = {'ip_address': ip_address, 'serial_number': serial_number, 'counter': counter, 'time': time()}
+        with self._lock:
+            self._readings[ip_address] = reading
+            self._serial_numbers[serial_number] = ip_address
+            try:
+                self.history.append(ip_address, reading['time'], counter_value(counter))
+            except ValueError:
+                pass  # a counter without digits is served but not kept in the history
+            del self._in_flight[ip_address]
+        future.set_result(reading)
+        return reading
+
+    def get(self, ip_address: str, max_age: float = None) -> dict:
+        """
+        Get the reading of the printer, refreshing it if it is older than the freshness bound.
+
+        Args:
+            ip_address (str): The IP address of the printer.
+            max_age (float): The freshness bound in seconds, defaults to 'max_age' of the index.
+
+        Raises:
+            KeyError: If the printer is not one of the indexed printers.
+            CreateReportError: If the device report cannot be created.
+            ReportError: If the values cannot be found in the device report.
+
+        Returns:
+            dict: The reading of the printer.
+        """
+        if ip_address not in self.ip_addresses:
+            raise KeyError(ip_address)
+
+        max_age = self.max_age if max_age is None else max_age
+        reading = self._readings.get(ip_address)
+        if reading and time() - reading['time'] <= max_age:
+            return reading
+        return self._fetch(ip_address)
+
+    def find(self, serial_number: str) -> Optional[str]:
+        """
+        Get the IP address of the printer with the serial number.
+
+        Args:
+            serial_number (str): The serial number of the printer.
+
+        Returns:
+            Optional[str]: The IP address, or None if no printer with the serial number was read yet.
+        """
+        return self._serial_numbers.get(serial_number)
+
+    def readings(self) -> list:
+        """
+        Get the cached readings of every printer, without refreshing them.
+
+        Returns:
+            list: The readings of the printers read so far.
+        """
+        return [self._readings[ip_address] for ip_address in self.ip_addresses if ip_address in self._readings]
+
+
+def _serializable(reading: dict) -> dict:
+    """
+    Convert the reading to a JSON friendly dictionary.
+
+    Args:
+        reading (dict): The reading to convert.
+
+    Returns:
+        dict: The reading with the time in ISO 8601 format and its age in seconds.
+    """
+    return {
+        **reading,
+        'time': datetime.fromtimestamp(reading['time']).isoformat(timespec='seconds'),
+        'age': round(time() - reading['time'], 3),
+    }
+
+
+class CounterRequestHandler(BaseHTTPRequestHandler):
+    """
+    A request handler serving the readings of the CounterIndex set as 'index' on the server as JSON.
+    """
+    def _send(self, status: int, content):
+        """
+        Send a JSON response.
+
+        Args:
+            status (int): The HTTP status code.
+            content: The JSON serializable content.
+        """
+        body = json.dumps(content).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        """
+        Serve the GET requests.
+        """
+        index = self.server.index
+        url = urlsplit(self.path)
+        parts = [unquote(part) for part in url.path.split('/') if part]
+        try:
+            max_age = float(parse_qs(url.query)['max_age'][0])
+        except KeyError:
+            max_age = None
+        except ValueError:
+            self._send(400, {'error': 'max_age must be a number'})
+            return
+
+        if parts == ['devices']:
+            self._send(200, [_serializable(reading) for reading in index.readings()])
+            return
+
+        if len(parts) != 2 or parts[0] not in ('devices', 'serial', 'history'):
+            self._send(404, {'error': 'not found'})
+            return
+
+        if parts[0] == 'history':
+            if parts[1] not in index.ip_addresses:
+                self._send(404, {'error': f'unknown printer {parts[1]}'})
+                return
+            ring = index.history.get(parts[1])
+            self._send(200, [[reading.time, reading.counter] for reading in ring or ()])
+            return
+
+        ip_address = parts[1] if parts[0] == 'devices' else index.find(parts[1])
+        try:
+            self._send(200, _serializable(index.get(ip_address, max_age)))
+        except KeyError:
+            self._send(404, {'error': f'unknown printer {parts[1]}'})
+        except CreateReportError:
+            self._send(502, {'error': f'unable to create report for printer {ip_address}'})
+        except ReportError:
+            self._send(502, {'error': f'unable to read report of printer {ip_address}'})
+
+    def log_message(self, format, *args):
+        """Silence the request log"""
+
+
+def create_server(index: CounterIndex, host: str = '127.0.0.1', port: int = 8080) -> ThreadingHTTPServer:
+    """
+    Create the HTTP server serving the readings of the index.
+
+    Args:
+        index (CounterIndex): The index of the readings.
+        host (str): The address to listen on.
+        port (int): The port to listen on.
+
+    Returns:
+        ThreadingHTTPServer: The server, ready for 'serve_forever'.
+    """
+    server = ThreadingHTTPServer((host, port), CounterRequestHandler)
+    server.index = index
+    return server
@@ -31,3 +31,58 @@ def message_body(counter: str, serial_number: str) -> str:
 Printer serial number: {serial_number}
 Printer counter: {counter} copies
 """
+
+
+def not_responding_body(ip_address: str) -> str:
+    """
+    Generate the part of an email message for a printer that did not respond.
+
+    Args:
+        ip_address (str): The printer's IP address.
+
+    Returns:
+        str: The part of the email message for the printer.
+    """
+    return f"""Printer {ip_address}: not responding
+"""
+
+
+def unreadable_body(ip_address: str) -> str:
+    """
+    Generate the part of an email message for a printer whose report could not be read.
+
+    Args:
+        ip_address (str): The printer's IP address.
+
+    Returns:
+        str: The part of the email message for the printer.
+    """
+    return f"""Printer {ip_address}: report cannot be read
+"""
+
+
+def changes_body(changes: list) -> str:
+    """
+    Generate the body for an email message containing only the devices that changed.
+
+    Args:
+        changes (list): The changes returned by 'ReadingStore.update' and 'ReadingStore.mark_unreachable'.
+
+    Returns:
+        str: The body of the email message listing the changed devices.
+    """
+    lines = [f"Time: {datetime.now().strftime('%d-%m-%Y %H:%M')}"]
+    for change in changes:
+        lines.append('')
+        lines.append(f"Printer: {change['ip_address']} ({', '.join(change['reasons'])})")
+        if change['serial_number']:
+            lines.append(f"Printer serial number: {change['serial_number']}")
+        if 'counter' in change:
+            lines.append(f"Printer counter: {change['counter']} copies")
+        if change.get('delta'):
+            lines.append(f"Since last report: {change['delta']:+} copies")
+        if 'month_pages' in change:
+            lines.append(f"This month: {change['month_pages']} copies")
+        if 'last_seen' in change:
+            lines.append(f"Last seen: {change['last_seen']}")
+    return '\n'.join(lines) + '\n'